@@ -0,0 +1,82 @@
+"""Measure gazetteer load time and per-article entity extraction time.
+
+Compiles a synthetic gazetteer (or uses a built index given with --index),
+maps it, and times extraction over summary-length and full-article text
+sprinkled with known names, and over the article prefix the scraper matches.
+
+    cd backend
+    python -m benchmarks.bench_entities --entities 200000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper import ENTITY_TEXT_CHARS
+from services.gazetteer import ENTITY_TYPES, Gazetteer, build_gazetteer
+
+FILLER = ("the war was fought across several fronts and the campaign that followed "
+          "changed the balance of power in the region for decades").split()
+
+
+def synthetic_entries(count: int):
+    random.seed(1)
+    syllables = ["ka", "lo", "mer", "tan", "vi", "sor", "del", "ru", "bin", "ost"]
+    for i in range(count):
+        words = ["".join(random.choices(syllables, k=3)).title() for _ in range(random.randint(1, 3))]
+        name = " ".join(words)
+        yield name, name, ENTITY_TYPES[i % len(ENTITY_TYPES)]
+
+
+def synthetic_text(names, words: int) -> str:
+    random.seed(2)
+    out = []
+    while len(out) < words:
+        out.extend(random.choice(names).split() if random.random() < 0.05 else [random.choice(FILLER)])
+    return " ".join(out)
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--index", help="path to a gazetteer built with build_gazetteer.py")
+    parser.add_argument("--entities", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    path = args.index
+    if path is None:
+        entries = list(synthetic_entries(args.entities))
+        path = os.path.join(tempfile.mkdtemp(), "gazetteer.bin")
+        start = time.perf_counter()
+        build_gazetteer(entries, path)
+        print(f"Built {len(entries)} entities in {time.perf_counter() - start:.1f}s "
+              f"({os.path.getsize(path) // 1024} KiB)")
+
+    start = time.perf_counter()
+    gazetteer = Gazetteer(path)
+    print(f"Load: {(time.perf_counter() - start) * 1000:.1f} ms for {len(gazetteer.names)} entities")
+
+    names = gazetteer.names[:5000]
+    for label, words in (("summary", 150), ("article", 1500), ("long article", 10000)):
+        text = synthetic_text(names, words)
+        ms = timed(lambda: gazetteer.extract(text), args.repeat)
+        print(f"{label:>13} ({words:>5} words): {ms:.3f} ms")
+
+    text = synthetic_text(names, 10000)[:ENTITY_TEXT_CHARS]
+    ms = timed(lambda: gazetteer.extract(text), args.repeat)
+    print(f"{'scraper cap':>13} ({len(text.split()):>5} words): {ms:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Measure article parsing throughput as parse concurrency rises.
+
+Parses a large article (a synthetic World War II-sized page, or a saved page
+given with --html) from several request threads at once, first inline in the
+web process and then through the process pool, and reports articles/second.
+Run it on a multi-core box; on one core the pool can only add overhead.
+
+    cd backend
+    python -m benchmarks.bench_parsing --requests 32 --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper import extract_article
+from services.parse_executor import ParseExecutor
+
+URL = "https://en.wikipedia.org/wiki/World_War_II"
+
+
+def synthetic_article(paragraphs: int = 600) -> bytes:
+    parts = ['<html><body><h1 class="firstHeading">World War II</h1><div class="mw-parser-output">']
+    for i in range(paragraphs):
+        if i % 20 == 0:
+            parts.append(f'<h2><span class="mw-headline">Section {i // 20}</span></h2>')
+        if i % 15 == 0:
+            parts.append('<table><tr><td>Infobox</td><td>data</td></tr></table>')
+        links = " ".join(
+            f'<a href="/wiki/Topic_{i}_{j}">Topic {i} {j}</a> of the campaign' for j in range(6)
+        )
+        parts.append(
+            f"<p>Paragraph {i} describes events of the war in detail, {links}, "
+            f"with further context about the belligerents.<sup>[{i}]</sup> "
+            f"It continues with more narrative text [citation needed] about operations.</p>"
+        )
+    parts.append("</div></body></html>")
+    return "".join(parts).encode()
+
+
+def run(extract, html: bytes, requests: int, concurrency: int) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as threads:
+        list(threads.map(lambda _: extract(URL, html), range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--html", help="path to a saved Wikipedia page")
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    if args.html:
+        with open(args.html, "rb") as f:
+            html = f.read()
+    else:
+        html = synthetic_article()
+
+    start = time.perf_counter()
+    extract_article(URL, html)
+    print(f"Single parse: {(time.perf_counter() - start) * 1000:.0f} ms for {len(html) // 1024} KiB "
+          f"({os.cpu_count()} CPUs, {args.workers} pool workers)")
+
+    executor = ParseExecutor(workers=args.workers)
+    executor.extract(URL, html)  # start the workers outside the timed runs
+    print(f"{'concurrency':>12} {'inline/s':>10} {'pool/s':>10}")
+    for concurrency in (1, 2, 4, 8, 16):
+        inline = run(extract_article, html, args.requests, concurrency)
+        pooled = run(executor.extract, html, args.requests, concurrency)
+        print(f"{concurrency:>12} {inline:>10.1f} {pooled:>10.1f}")
+    executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Compare the Pydantic response path with the orjson fast path.
+
+Fills a throwaway SQLite database with synthetic quizzes and times each path
+for the list and detail endpoints. That both paths produce the same JSON is
+checked by tests/test_fast_json.py.
+
+    cd backend
+    python -m benchmarks.bench_serialization --articles 2000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench_serialization.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from pydantic import TypeAdapter
+import models
+import schemas
+from database import engine, SessionLocal
+from services import fast_json
+
+
+def seed(count: int) -> None:
+    models.Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    start = datetime(2025, 1, 1)
+    for i in range(count):
+        db.add(models.Article(
+            url=f"https://en.wikipedia.org/wiki/Article_{i}",
+            title=f"Article {i}",
+            summary="Summary sentence. " * 20,
+            content="Content sentence. " * 500,
+            sections=[f"Section {s}" for s in range(10)],
+            key_entities={
+                "people": [f"Person {p}" for p in range(5)],
+                "organizations": [f"Organization {o}" for o in range(5)],
+                "locations": [f"Location {l}" for l in range(5)]
+            },
+            quiz=[
+                {
+                    "question": f"Question {q} about article {i}?",
+                    "options": [f"Option {o}" for o in "ABCD"],
+                    "answer": "Option B",
+                    "difficulty": "medium",
+                    "explanation": "Because the article says so. " * 3
+                }
+                for q in range(7)
+            ],
+            related_topics=[f"Topic {t}" for t in range(5)],
+            created_at=start + timedelta(minutes=i)
+        ))
+    db.commit()
+    db.close()
+
+
+list_adapter = TypeAdapter(List[schemas.ArticleListItem])
+
+
+def pydantic_list(db) -> bytes:
+    # What FastAPI does for response_model=List[ArticleListItem]
+    quizzes = db.query(models.Article).order_by(models.Article.created_at.desc()).all()
+    content = list_adapter.dump_python(list_adapter.validate_python(quizzes, from_attributes=True), mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def pydantic_detail(db, article_id: int) -> bytes:
+    quiz = db.query(models.Article).filter(models.Article.id == article_id).first()
+    content = schemas.ArticleResponse.model_validate(quiz).model_dump(mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def fast_detail(db, article_id: int) -> bytes:
+    return fast_json.serialize_article_row(fast_json.article_row(db, article_id))
+
+
+def timed(label: str, fn, repeat: int) -> float:
+    db = SessionLocal()
+    fn(db)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(db)
+        db.expunge_all()
+    elapsed = (time.perf_counter() - start) / repeat
+    db.close()
+    print(f"  {label:<10} {elapsed * 1000:8.2f} ms")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--articles", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    seed(args.articles)
+    detail_ids = list(range(1, min(args.articles, 200) + 1))
+
+    print(f"GET /api/quizzes ({args.articles} rows)")
+    slow = timed("pydantic", pydantic_list, args.repeat)
+    fast = timed("orjson", lambda db: fast_json.serialize_article_list(db), args.repeat)
+    print(f"  speedup    {slow / fast:8.1f}x")
+
+    print(f"GET /api/quizzes/{{id}} ({len(detail_ids)} lookups)")
+    slow = timed("pydantic", lambda db: [pydantic_detail(db, i) for i in detail_ids], args.repeat)
+    fast = timed("orjson", lambda db: [fast_detail(db, i) for i in detail_ids], args.repeat)
+    print(f"  speedup    {slow / fast:8.1f}x")
+
+    os.remove(DB_PATH)
+
+
+if __name__ == "__main__":
+    main()
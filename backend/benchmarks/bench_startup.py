@@ -0,0 +1,81 @@
+"""Measure backend cold-start time.
+
+For each run, starts a fresh `uvicorn main:app` process and records how long it
+takes until `GET /` returns its first byte, plus how long `import main` takes
+in a bare interpreter.
+
+    cd backend
+    python -m benchmarks.bench_startup --runs 5
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def env() -> dict:
+    result = dict(os.environ)
+    result.setdefault("GROQ_API_KEY", "benchmark-key")
+    return result
+
+
+def time_to_first_byte() -> float:
+    port = free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port)],
+        cwd=BACKEND_DIR, env=env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while True:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    response.read(1)
+                    return time.perf_counter() - start
+            except OSError:
+                if process.poll() is not None:
+                    raise RuntimeError("uvicorn exited before serving a request")
+                time.sleep(0.005)
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def import_time() -> float:
+    code = "import time; s = time.perf_counter(); import main; print(time.perf_counter() - s)"
+    output = subprocess.check_output([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env())
+    return float(output.decode().strip().splitlines()[-1])
+
+
+def summarize(label: str, samples) -> None:
+    print(f"  {label:<22} median {statistics.median(samples) * 1000:7.1f} ms"
+          f"   min {min(samples) * 1000:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    imports = [import_time() for _ in range(args.runs)]
+    first_bytes = [time_to_first_byte() for _ in range(args.runs)]
+
+    print(f"Cold start over {args.runs} runs")
+    summarize("import main", imports)
+    summarize("time to first byte", first_bytes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Exercise the Groq provider guard against a local fake provider.
+
+Starts an OpenAI-compatible chat completions server on localhost that injects
+latency, 429s (with Retry-After) and 5xx errors, points QuizService at it via
+GROQ_BASE_URL and fires concurrent quiz generations.
+
+    cd backend
+    python -m benchmarks.fake_provider --requests 40 --concurrency 16 --rate-limit 0.3
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+QUESTIONS = [
+    {
+        "question": f"Fake question {i}?",
+        "options": ["A", "B", "C", "D"],
+        "correct_answer": "B",
+        "explanation": "Served by the fake provider"
+    }
+    for i in range(7)
+]
+
+
+def make_handler(
+    latency: float,
+    rate_limit: float,
+    error_rate: float,
+    stats: Counter,
+    script: Optional[list] = None,
+    arrivals: Optional[list] = None,
+):
+    """Request handler for the fake provider.
+
+    Responses are random unless `script` is given: a list of (status, delay,
+    retry_after) tuples served in order (200 once it runs out). `arrivals`
+    collects the monotonic time each request came in. Both are used by tests.
+    """
+    script_lock = threading.Lock()
+
+    class FakeGroqHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, body: dict, headers: dict = None):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if arrivals is not None:
+                arrivals.append(time.monotonic())
+            if script is not None:
+                with script_lock:
+                    status, delay, retry_after = script.pop(0) if script else (200, 0, None)
+                time.sleep(delay)
+            else:
+                time.sleep(random.uniform(0, latency))
+                roll = random.random()
+                status, retry_after = (
+                    (429, "1") if roll < rate_limit else
+                    (503, None) if roll < rate_limit + error_rate else
+                    (200, None)
+                )
+            if status == 429:
+                stats["429"] += 1
+                self._send(429, {"error": {"message": "Rate limit reached"}}, {"Retry-After": retry_after or "1"})
+            elif status != 200:
+                stats[str(status)] += 1
+                self._send(status, {"error": {"message": "Fake provider error"}})
+            else:
+                stats["200"] += 1
+                self._send(200, {
+                    "id": "chatcmpl-fake",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": "llama-3.3-70b-versatile",
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": json.dumps(QUESTIONS)},
+                        "finish_reason": "stop"
+                    }],
+                    "usage": {"prompt_tokens": 1000, "completion_tokens": 500, "total_tokens": 1500}
+                })
+
+    return FakeGroqHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.5, help="max injected latency in seconds")
+    parser.add_argument("--rate-limit", type=float, default=0.3, help="fraction of calls answered with 429")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="fraction of calls answered with 503")
+    args = parser.parse_args()
+
+    provider_stats = Counter()
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0),
+        make_handler(args.latency, args.rate_limit, args.error_rate, provider_stats)
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    os.environ["GROQ_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ.setdefault("GROQ_API_KEY", "fake-key")
+    os.environ.setdefault("GROQ_REQUESTS_PER_MINUTE", "120")
+    os.environ.setdefault("GROQ_TOKENS_PER_MINUTE", "200000")
+
+    from services.quiz_services import QuizService
+    from services.provider_guard import ProviderUnavailableError
+
+    service = QuizService()
+    outcomes = Counter()
+    latencies = []
+
+    def one_request(_):
+        start = time.perf_counter()
+        try:
+            service.generate_quiz("Fake topic", "Fake content " * 100, num_questions=7)
+            outcomes["ok"] += 1
+        except ProviderUnavailableError as e:
+            outcomes[f"rejected (retry after {e.retry_after}s)"] += 1
+        except Exception:
+            outcomes["failed"] += 1
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(one_request, range(args.requests)))
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    latencies.sort()
+    print("=" * 50)
+    print(f"Requests: {args.requests} at concurrency {args.concurrency} in {elapsed:.2f}s")
+    print("Provider responses:", dict(provider_stats))
+    print("Client outcomes:", dict(outcomes))
+    print(f"Latency p50={latencies[len(latencies) // 2]:.2f}s max={latencies[-1]:.2f}s")
+    print("Circuit breaker:", service.guard.breaker.state)
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    main()
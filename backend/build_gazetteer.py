@@ -0,0 +1,108 @@
+"""Build the gazetteer index used to type key entities.
+
+Entities come from the stored HTML snapshots: each snapshotted article is
+typed from its Wikipedia categories, and the anchor texts other articles use
+to link to it become aliases. A TSV seed file (name, type, optional aliases)
+can add entities that have not been snapshotted yet:
+
+    python build_gazetteer.py --seed seed.tsv
+    python reextract.py
+
+reextract.py invalidates cached quiz responses, and ETags follow the new
+bodies. Restart the app (or its workers) to pick up a rebuilt index for
+newly generated quizzes.
+"""
+import argparse
+import json
+import re
+import time
+from collections import Counter
+from typing import Dict, List, Tuple
+from urllib.parse import unquote
+import models
+from database import SessionLocal
+from services.gazetteer import ENTITY_TYPES, GAZETTEER_PATH, build_gazetteer, classify_categories
+from services.snapshot_store import decompress
+
+TITLE_PATTERN = re.compile(rb'"wgTitle":\s*("(?:[^"\\]|\\.)*")')
+CATEGORIES_PATTERN = re.compile(rb'"wgCategories":\s*(\[[^\]]*\])')
+ANCHOR_PATTERN = re.compile(rb'<a href="/wiki/([^"#?:]+)[^"]*"[^>]*>([^<]{2,80})</a>')
+DISAMBIGUATOR_PATTERN = re.compile(r"\s+\([^)]*\)$")
+
+
+def page_metadata(html: bytes) -> Tuple[str, List[str]]:
+    title = TITLE_PATTERN.search(html)
+    categories = CATEGORIES_PATTERN.search(html)
+    return (
+        json.loads(title.group(1)) if title else "",
+        json.loads(categories.group(1)) if categories else []
+    )
+
+
+def read_seed(path: str) -> List[Tuple[str, str, str]]:
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            fields = [field.strip() for field in line.rstrip("\n").split("\t")]
+            if not fields[0] or fields[0].startswith("#"):
+                continue
+            if len(fields) < 2 or fields[1] not in ENTITY_TYPES:
+                raise ValueError(f"{path}:{line_number}: expected name<TAB>{'|'.join(ENTITY_TYPES)}")
+            name = fields[0]
+            entries.extend((surface, name, fields[1]) for surface in [name] + [a for a in fields[2:] if a])
+    return entries
+
+
+def snapshot_entries(min_anchor_count: int) -> List[Tuple[str, str, str]]:
+    """Typed titles and anchor aliases from the latest snapshot of each URL"""
+    db = SessionLocal()
+    typed: Dict[str, str] = {}
+    anchors: Counter = Counter()
+    try:
+        latest = dict(
+            db.query(models.SnapshotRevision.url, models.SnapshotRevision.content_hash)
+            .order_by(models.SnapshotRevision.id)
+        )
+        for content_hash in set(latest.values()):
+            snapshot = db.get(models.PageSnapshot, content_hash)
+            html = decompress(snapshot.codec, snapshot.data)
+            db.expunge(snapshot)
+            title, categories = page_metadata(html)
+            entity_type = classify_categories(categories)
+            if title and entity_type:
+                typed[title] = entity_type
+            for target, text in ANCHOR_PATTERN.findall(html):
+                anchors[(unquote(target.decode()).replace("_", " "), text.decode().strip())] += 1
+    finally:
+        db.close()
+
+    entries = []
+    for title, entity_type in typed.items():
+        entries.append((title, title, entity_type))
+        short = DISAMBIGUATOR_PATTERN.sub("", title)
+        if short != title:
+            entries.append((short, title, entity_type))
+    for (target, text), count in anchors.items():
+        # Lower-case anchors ("the city") are too ambiguous to match on
+        if target in typed and count >= min_anchor_count and text[:1].isupper():
+            entries.append((text, target, typed[target]))
+    print(f"Typed {len(typed)} snapshotted articles")
+    return entries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the gazetteer index used to type key entities")
+    parser.add_argument("--output", default=GAZETTEER_PATH)
+    parser.add_argument("--seed", action="append", default=[], help="TSV of name, type and aliases")
+    parser.add_argument("--min-anchor-count", type=int, default=1)
+    parser.add_argument("--no-snapshots", action="store_true", help="build from seed files only")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    entries = []
+    for path in args.seed:
+        entries.extend(read_seed(path))
+    if not args.no_snapshots:
+        entries.extend(snapshot_entries(args.min_anchor_count))
+    patterns = build_gazetteer(entries, args.output)
+    print(f"Wrote {patterns} patterns to {args.output} in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,34 @@
+# Multi-worker entry point: gunicorn -c gunicorn.conf.py main:app
+#
+# Workers share response cache entries, generation locks and metrics through
+# SHARED_STORE_URL (defaults to a SQLite file next to the app when more than
+# one worker is configured; point it at redis://... to share across machines).
+#
+# With AUTO_MIGRATE on, the master runs migrations once before forking, so the
+# workers never race each other creating the same tables.
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', 8000)}"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = int(os.getenv("WORKER_TIMEOUT", 120))
+graceful_timeout = 30
+keepalive = 5
+
+# Workers read WEB_CONCURRENCY to split provider rate limits and pick the shared store
+os.environ["WEB_CONCURRENCY"] = str(workers)
+if workers > 1:
+    os.environ.setdefault("SHARED_STORE_URL", "sqlite:///./shared_store.db")
+
+
+def on_starting(server):
+    if os.getenv("AUTO_MIGRATE", "1").lower() not in ("1", "true", "yes"):
+        return
+    from database import engine
+    from migrate import run_migrations
+    run_migrations()
+    # Workers are forked from this process; they must not share its connections
+    engine.dispose()
+    os.environ["AUTO_MIGRATE"] = "0"
+    server.log.info("Database schema is up to date")
@@ -1,13 +1,26 @@
-from groq import Groq
 import json
 import os
 from dotenv import load_dotenv
+from services.provider_guard import ProviderUnavailableError, get_provider_guard, estimate_tokens
 
 load_dotenv()
 
 class LLMService:
     def __init__(self):
-        self.client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+        self._client = None
+        self.guard = get_provider_guard()
+    
+    @property
+    def client(self):
+        """Groq client, created on first use to keep the SDK off the startup path"""
+        if self._client is None:
+            from groq import Groq
+            self._client = Groq(
+                api_key=os.getenv("GROQ_API_KEY"),
+                timeout=float(os.getenv("GROQ_TIMEOUT", 30)),
+                max_retries=0
+            )
+        return self._client
         
     def generate_quiz(self, title: str, content: str, sections: list) -> dict:
         """Generate quiz from article content using Groq"""
@@ -26,8 +39,6 @@ Generate EXACTLY 7 quiz questions with the following requirements:
 4. One correct answer
 5. Brief explanation referencing the article
 
-Also suggest 5 related Wikipedia topics for further reading.
-
 Return ONLY valid JSON in this exact format (no markdown, no extra text):
 {{
   "quiz": [
@@ -38,17 +49,16 @@ Return ONLY valid JSON in this exact format (no markdown, no extra text):
       "difficulty": "easy",
       "explanation": "Brief explanation from article"
     }}
-  ],
-  "related_topics": ["Topic 1", "Topic 2", "Topic 3", "Topic 4", "Topic 5"]
+  ]
 }}"""
 
         try:
-            response = self.client.chat.completions.create(
+            response = self.guard.call(lambda: self.client.chat.completions.create(
                 model="llama-3.3-70b-versatile",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.7,
                 max_tokens=2000
-            )
+            ), estimated_tokens=estimate_tokens(prompt, 2000))
             
             result_text = response.choices[0].message.content.strip()
             
@@ -63,6 +73,8 @@ Return ONLY valid JSON in this exact format (no markdown, no extra text):
             result = json.loads(result_text.strip())
             return result
             
+        except ProviderUnavailableError:
+            raise
         except Exception as e:
             print(f"LLM Error: {e}")
             raise Exception(f"Failed to generate quiz: {str(e)}")
\ No newline at end of file
@@ -1,24 +1,59 @@
-from fastapi import FastAPI, Depends, HTTPException
+from services import startup_profile
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, HTTPException, Header, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy.exc import SQLAlchemyError
+from typing import List, Optional
 import models
 import schemas
-from database import engine, get_db
+from database import get_db, SessionLocal
 from scraper import WikipediaScraper
-from services.quiz_services import QuizService
+from services.quiz_services import get_quiz_service
+from services.provider_guard import ProviderUnavailableError, get_provider_guard
+from services import fast_json, metrics
+from services.shared_store import LockTimeoutError, get_shared_store
+from services.link_graph import link_graph
+from services.parse_executor import parse_executor
+from services.snapshot_store import save_snapshot
+from services.gazetteer import get_gazetteer
+from services import bulk_transfer
+from services.response_cache import quiz_response_cache, make_etag, etag_matches, CACHE_CONTROL
 import os
+import hmac
 import json
+startup_profile.mark("imports")
 PORT = int(os.getenv("PORT", 8000))
+# Create missing tables on startup when running as a single uvicorn process; under
+# gunicorn the master migrates once before forking and turns this off for the workers
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "1").lower() in ("1", "true", "yes")
+# Bulk export/import are disabled unless this token is set and sent as X-Admin-Token
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+# Longest a request waits for another worker generating the same URL
+GENERATE_LOCK_TIMEOUT = float(os.getenv("GENERATE_LOCK_TIMEOUT", 180))
+GENERATE_RETRY_AFTER = 10
 origins = [
     "http://localhost:3000",
     "https://wiki-quiz-app-frontend.onrender.com",  # Update this after deploying frontend
 ]
 
-# Create database tables
-models.Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if AUTO_MIGRATE:
+        from migrate import run_migrations
+        run_migrations()
+        startup_profile.mark("migrations")
+    # Map the entity index before the first request rather than during it
+    get_gazetteer()
+    startup_profile.mark("gazetteer")
+    startup_profile.mark("ready")
+    startup_profile.report()
+    yield
+    parse_executor.shutdown()
 
-app = FastAPI(title="Wiki Quiz API")
+app = FastAPI(title="Wiki Quiz API", lifespan=lifespan)
 
 
 
@@ -31,14 +66,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-quiz_service = QuizService()
+startup_profile.mark("app")
 
 @app.get("/")
 def read_root():
     return {"message": "Wiki Quiz API is running!"}
 
 @app.post("/api/generate-quiz", response_model=schemas.ArticleResponse)
-async def generate_quiz(url_input: schemas.URLInput, db: Session = Depends(get_db)):
+def generate_quiz(url_input: schemas.URLInput, db: Session = Depends(get_db)):
     """Generate quiz from Wikipedia URL"""
     try:
         url = str(url_input.url)
@@ -46,75 +81,149 @@ async def generate_quiz(url_input: schemas.URLInput, db: Session = Depends(get_d
         # Check if URL already exists (caching)
         existing = db.query(models.Article).filter(models.Article.url == url).first()
         if existing:
+            metrics.record("quizzes_reused")
             return existing
         
-        # Scrape Wikipedia
-        scraper = WikipediaScraper(url)
-        scraped_data = scraper.scrape()
-        
-        # Generate quiz using AI
-        quiz_questions = quiz_service.generate_quiz(
-            topic=scraped_data['title'],
-            content=scraped_data['content'],
-            num_questions=7
-        )
-        
-        # Format quiz with difficulty levels
-        formatted_quiz = []
-        difficulty_levels = ['easy', 'easy', 'medium', 'medium', 'medium', 'hard', 'hard']
-        
-        for idx, q in enumerate(quiz_questions):
-            formatted_quiz.append({
-                'question': q['question'],
-                'options': q['options'],
-                'answer': q['correct_answer'],
-                'difficulty': difficulty_levels[idx] if idx < len(difficulty_levels) else 'medium',
-                'explanation': q.get('explanation', 'No explanation provided')
-            })
-        
-        # Generate related topics (simple implementation)
-        related_topics = [
-            scraped_data['title'] + " history",
-            "Computer Science",
-            "Mathematics",
-            "Technology",
-            "Innovation"
-        ]
-        
-        # Save to database
-        article = models.Article(
-            url=url,
-            title=scraped_data['title'],
-            summary=scraped_data['summary'],
-            content=scraped_data['content'],
-            sections=scraped_data['sections'],
-            key_entities=scraped_data['key_entities'],
-            quiz=formatted_quiz,
-            related_topics=related_topics
-        )
-        
-        db.add(article)
-        db.commit()
-        db.refresh(article)
+        # Only one worker scrapes and calls the LLM for a URL; concurrent requests wait and reuse it
+        with get_shared_store().lock(f"generate:{url}", timeout=GENERATE_LOCK_TIMEOUT, wait=GENERATE_LOCK_TIMEOUT):
+            existing = db.query(models.Article).filter(models.Article.url == url).first()
+            if existing:
+                metrics.record("quizzes_reused")
+                return existing
+            article = create_article(url, db)
         
+        metrics.record("quizzes_generated")
         return article
         
+    except ProviderUnavailableError as e:
+        metrics.record("provider_rejected")
+        # Backpressure: tell the client when to come back instead of holding the worker
+        raise HTTPException(
+            status_code=503,
+            detail=f"Failed to generate quiz: {str(e)}",
+            headers={
+                "Retry-After": str(e.retry_after),
+                "X-Queue-Depth": str(get_provider_guard().queue_depth)
+            }
+        )
+    except LockTimeoutError:
+        metrics.record("quizzes_failed")
+        # Another worker is still generating this URL; it will be cached once it finishes
+        raise HTTPException(
+            status_code=503,
+            detail="Failed to generate quiz: this article is still being generated",
+            headers={"Retry-After": str(GENERATE_RETRY_AFTER)}
+        )
     except Exception as e:
+        metrics.record("quizzes_failed")
         raise HTTPException(status_code=400, detail=f"Failed to generate quiz: {str(e)}")
 
+def create_article(url: str, db: Session) -> models.Article:
+    """Scrape a Wikipedia URL, generate its quiz and save it"""
+    # Scrape Wikipedia: fetch here, parse in the process pool
+    scraper = WikipediaScraper(url)
+    html = scraper.download()
+    scraped_data = parse_executor.extract(url, html)
+    
+    # Generate quiz using AI
+    quiz_questions = get_quiz_service().generate_quiz(
+        topic=scraped_data['title'],
+        content=scraped_data['content'],
+        num_questions=7
+    )
+    
+    # Format quiz with difficulty levels
+    formatted_quiz = []
+    difficulty_levels = ['easy', 'easy', 'medium', 'medium', 'medium', 'hard', 'hard']
+    
+    for idx, q in enumerate(quiz_questions):
+        formatted_quiz.append({
+            'question': q['question'],
+            'options': q['options'],
+            'answer': q['correct_answer'],
+            'difficulty': difficulty_levels[idx] if idx < len(difficulty_levels) else 'medium',
+            'explanation': q.get('explanation', 'No explanation provided')
+        })
+    
+    # Keep the raw page so extraction changes can be replayed without refetching.
+    # Staged only after the LLM call: on SQLite a flushed write holds the database lock
+    save_snapshot(db, url, html)
+    
+    # Related topics come from the local link graph (no extra LLM or network calls)
+    link_graph.record(db, scraped_data['title'], scraped_data['links'])
+    related_topics = link_graph.related(scraped_data['title'], limit=5)
+    
+    # Save to database
+    article = models.Article(
+        url=url,
+        title=scraped_data['title'],
+        summary=scraped_data['summary'],
+        content=scraped_data['content'],
+        sections=scraped_data['sections'],
+        key_entities=scraped_data['key_entities'],
+        quiz=formatted_quiz,
+        related_topics=related_topics
+    )
+    
+    db.add(article)
+    db.commit()
+    db.refresh(article)
+    
+    return article
+
+@app.get("/api/metrics")
+def get_metrics():
+    """Quiz generation counters, aggregated across worker processes"""
+    return metrics.snapshot()
+
 @app.get("/api/quizzes", response_model=List[schemas.ArticleListItem])
 async def get_all_quizzes(db: Session = Depends(get_db)):
     """Get all quizzes from history"""
+    if fast_json.FAST_RESPONSES:
+        return Response(content=fast_json.serialize_article_list(db), media_type="application/json")
     quizzes = db.query(models.Article).order_by(models.Article.created_at.desc()).all()
     return quizzes
 
 @app.get("/api/quizzes/{quiz_id}", response_model=schemas.ArticleResponse)
-async def get_quiz(quiz_id: int, db: Session = Depends(get_db)):
+async def get_quiz(
+    quiz_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
     """Get specific quiz by ID"""
-    quiz = db.query(models.Article).filter(models.Article.id == quiz_id).first()
-    if not quiz:
-        raise HTTPException(status_code=404, detail="Quiz not found")
-    return quiz
+    # Imports and re-extraction bump the version and invalidate the cache, so a cached body is current.
+    # The session only connects on first query, so cache hits never reach the DB.
+    cached = quiz_response_cache.get(quiz_id)
+    if cached is None:
+        # Revalidations are answered from the id, creation time and version alone
+        stamp = db.query(models.Article.created_at, models.Article.version)\
+            .filter(models.Article.id == quiz_id)\
+            .first()
+        if not stamp:
+            raise HTTPException(status_code=404, detail="Quiz not found")
+        current = make_etag(quiz_id, stamp.created_at, stamp.version)
+        if etag_matches(if_none_match, current):
+            return Response(status_code=304, headers={"ETag": current, "Cache-Control": CACHE_CONTROL})
+        if fast_json.FAST_RESPONSES:
+            quiz = fast_json.article_row(db, quiz_id)
+        else:
+            quiz = db.query(models.Article).filter(models.Article.id == quiz_id).first()
+        if not quiz:
+            raise HTTPException(status_code=404, detail="Quiz not found")
+        if fast_json.FAST_RESPONSES:
+            body = fast_json.serialize_article_row(quiz)
+        else:
+            body = schemas.ArticleResponse.model_validate(quiz).model_dump_json().encode()
+        # Tag the body with the version it was read at, not the one checked above
+        etag = make_etag(quiz_id, quiz.created_at, quiz.version)
+        quiz_response_cache.put(quiz_id, etag, body)
+    else:
+        etag, body = cached
+
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @app.delete("/api/quizzes/{quiz_id}")
 async def delete_quiz(quiz_id: int, db: Session = Depends(get_db)):
@@ -125,8 +234,56 @@ async def delete_quiz(quiz_id: int, db: Session = Depends(get_db)):
     
     db.delete(quiz)
     db.commit()
+    quiz_response_cache.invalidate(quiz_id)
     return {"message": "Quiz deleted successfully"}
 
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Bulk transfer is disabled (set ADMIN_TOKEN)")
+    # Constant-time comparison so response timing does not leak the token
+    if not hmac.compare_digest((x_admin_token or "").encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+@app.get("/api/export", dependencies=[Depends(require_admin)])
+def export_data(tables: Optional[str] = None, gzip: bool = False):
+    """Stream articles, quizzes and attempts as NDJSON"""
+    try:
+        table_names = bulk_transfer.parse_tables(tables)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    filename = "wiki-quiz-export.ndjson" + (".gz" if gzip else "")
+    return StreamingResponse(
+        bulk_transfer.export_stream(table_names, compress=gzip),
+        media_type="application/gzip" if gzip else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@app.post("/api/import", dependencies=[Depends(require_admin)])
+async def import_data(request: Request):
+    """Import NDJSON (plain or gzip) produced by /api/export"""
+    db = SessionLocal()
+    try:
+        decoder = bulk_transfer.LineDecoder()
+        importer = bulk_transfer.BulkImporter(db)
+        # Parse and write batches off the event loop while the body streams in
+        async for chunk in request.stream():
+            lines = decoder.feed(chunk)
+            if lines:
+                await run_in_threadpool(importer.feed, lines)
+        await run_in_threadpool(importer.feed, decoder.finish())
+        counts = await run_in_threadpool(importer.finish)
+    except (ValueError, KeyError, SQLAlchemyError) as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail=f"Failed to import: {str(e)} (already committed: {importer.counts})"
+        )
+    finally:
+        db.close()
+        # Upserted articles may replace cached bodies, even when a later batch failed
+        quiz_response_cache.invalidate_all()
+    return {"imported": counts, "orphaned_attempts": importer.orphaned_attempts}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=PORT) 
\ No newline at end of file
@@ -0,0 +1,37 @@
+"""Create the database schema.
+
+Run this once per deploy (Render runs it as the pre-deploy command) instead of
+on every app start:
+
+    python migrate.py
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateColumn
+import models
+from database import engine
+
+
+def add_missing_columns():
+    """Add columns introduced after a table was created (create_all skips existing tables)"""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in models.Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+                    print(f"Added column {table.name}.{column.name}")
+
+
+def run_migrations():
+    """Create any missing tables and columns"""
+    models.Base.metadata.create_all(bind=engine)
+    add_missing_columns()
+
+
+if __name__ == "__main__":
+    run_migrations()
+    print("Database schema is up to date")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer,Text, String, DateTime, JSON, Float, ForeignKey
+from sqlalchemy import Column, Integer,Text, String, DateTime, JSON, Float, ForeignKey, LargeBinary, BigInteger
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
@@ -17,6 +17,8 @@ class Article(Base):
     quiz = Column(JSON)
     related_topics = Column(JSON)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Bumped whenever stored fields are rewritten (import, re-extraction); part of the ETag
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
 class Quiz(Base):
     __tablename__ = "quizzes"
@@ -42,4 +44,29 @@ class QuizAttempt(Base):
     completed_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationship
-    quiz = relationship("Quiz", back_populates="attempts")
\ No newline at end of file
+    quiz = relationship("Quiz", back_populates="attempts")
+
+class ArticleLinks(Base):
+    __tablename__ = "article_links"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    title = Column(String, unique=True, index=True, nullable=False)
+    links = Column(JSON)  # Linked article titles, in page order
+
+class PageSnapshot(Base):
+    __tablename__ = "page_snapshots"
+    
+    content_hash = Column(String(64), primary_key=True)  # sha256 of the raw HTML
+    codec = Column(String, nullable=False)  # "zstd" or "zlib"
+    data = Column(LargeBinary, nullable=False)
+    raw_size = Column(Integer)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class SnapshotRevision(Base):
+    __tablename__ = "snapshot_revisions"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String, index=True, nullable=False)
+    revision_id = Column(BigInteger, index=True)  # Wikipedia wgRevisionId, when present
+    content_hash = Column(String(64), ForeignKey("page_snapshots.content_hash"), nullable=False)
+    fetched_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,141 @@
+"""Rebuild article fields from stored HTML snapshots, without any network I/O.
+
+Run after changing extraction logic in scraper.py (and bumping
+EXTRACTION_VERSION):
+
+    python reextract.py --workers 4
+
+Quizzes are left untouched; title, summary, content, sections, key entities
+and the link graph are recomputed from the latest snapshot of each article,
+then related topics are re-ranked over the rebuilt graph.
+Cached quiz responses are invalidated through the shared store, so run it with
+the app's SHARED_STORE_URL / WEB_CONCURRENCY; a single-worker app keeps its
+in-memory cache until it restarts.
+
+Running workers only load link rows added since their last refresh, so they
+do not see rewritten or removed rows: restart (or reload) the app afterwards
+so related topics for newly generated quizzes use the rebuilt graph.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+import orjson
+import models
+from database import SessionLocal
+from services.gazetteer import get_gazetteer
+from services.link_graph import LinkGraph
+from services.response_cache import quiz_response_cache
+from services.snapshot_store import extract_snapshot
+
+
+def latest_snapshots(db, urls):
+    """Map each URL to the (codec, data) of its most recent snapshot"""
+    rows = db.query(models.SnapshotRevision.url, models.PageSnapshot.codec, models.PageSnapshot.data)\
+        .join(models.PageSnapshot, models.SnapshotRevision.content_hash == models.PageSnapshot.content_hash)\
+        .filter(models.SnapshotRevision.url.in_(urls))\
+        .order_by(models.SnapshotRevision.id)\
+        .all()
+    return {url: (codec, data) for url, codec, data in rows}
+
+
+def update_links(db, title, links):
+    row = db.query(models.ArticleLinks).filter(models.ArticleLinks.title == title).first()
+    if row:
+        row.links = links
+    else:
+        db.add(models.ArticleLinks(title=title, links=links))
+        db.flush()
+
+
+def remove_links(db, title):
+    """Drop the link row of a title no article has any more"""
+    if not db.query(models.Article.id).filter(models.Article.title == title).first():
+        db.query(models.ArticleLinks).filter(models.ArticleLinks.title == title).delete()
+
+
+def rerank_related(db, batch_size: int) -> int:
+    """Recompute related topics for every article over the stored link graph"""
+    graph = LinkGraph()
+    graph.refresh(db)
+    changed = 0
+    last_id = 0
+    while True:
+        articles = db.query(models.Article)\
+            .filter(models.Article.id > last_id)\
+            .order_by(models.Article.id)\
+            .limit(batch_size)\
+            .all()
+        if not articles:
+            break
+        last_id = articles[-1].id
+        for article in articles:
+            related_topics = graph.related(article.title, limit=5)
+            if related_topics != article.related_topics:
+                article.related_topics = related_topics
+                article.version += 1
+                changed += 1
+        db.commit()
+        db.expunge_all()
+    return changed
+
+
+def reextract(workers: int, batch_size: int) -> None:
+    db = SessionLocal()
+    updated = missing = 0
+    start = time.perf_counter()
+    last_id = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"), initializer=get_gazetteer) as pool:
+            while True:
+                articles = db.query(models.Article)\
+                    .filter(models.Article.id > last_id)\
+                    .order_by(models.Article.id)\
+                    .limit(batch_size)\
+                    .all()
+                if not articles:
+                    break
+                last_id = articles[-1].id
+
+                snapshots = latest_snapshots(db, [article.url for article in articles])
+                found = [article for article in articles if article.url in snapshots]
+                missing += len(articles) - len(found)
+                futures = [pool.submit(extract_snapshot, article.url, *snapshots[article.url]) for article in found]
+
+                renamed = []
+                for article, future in zip(found, futures):
+                    data = orjson.loads(future.result())
+                    if data['title'] != article.title:
+                        renamed.append(article.title)
+                    article.title = data['title']
+                    article.summary = data['summary']
+                    article.content = data['content']
+                    article.sections = data['sections']
+                    article.key_entities = data['key_entities']
+                    article.version += 1
+                    update_links(db, data['title'], data['links'])
+                    updated += 1
+                for title in renamed:
+                    remove_links(db, title)
+                db.commit()
+                db.expunge_all()
+                print(f"Re-extracted {updated} articles ({missing} without snapshots)")
+        if updated:
+            print(f"Re-ranked related topics for {rerank_related(db, batch_size)} articles")
+    finally:
+        db.close()
+        if updated:
+            # Drop cached bodies in every worker, even if a later batch failed
+            quiz_response_cache.invalidate_all()
+            if quiz_response_cache.store is None:
+                print("No shared store configured: restart the app to drop its cached responses")
+    print(f"Done in {time.perf_counter() - start:.1f}s: {updated} updated, {missing} skipped")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild article fields from stored HTML snapshots")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+    reextract(args.workers, args.batch_size)
@@ -11,12 +11,11 @@ import models
 import schemas
 from database import get_db
 from services.wikipedia_services import WikipediaService
-from services.quiz_services import QuizService
+from services.quiz_services import QuizService, get_quiz_service
 
 router = APIRouter(prefix="/api/quiz", tags=["quiz"])
 
 wiki_service = WikipediaService()
-quiz_service = QuizService()
 
 @router.post("/generate", response_model=schemas.QuizResponse)
 async def generate_quiz(quiz_data: schemas.QuizCreate, db: Session = Depends(get_db)):
@@ -29,7 +28,7 @@ async def generate_quiz(quiz_data: schemas.QuizCreate, db: Session = Depends(get
     
     # Generate quiz questions
     try:
-        questions = quiz_service.generate_quiz(
+        questions = get_quiz_service().generate_quiz(
             topic=article["title"],
             content=article["content"],
             num_questions=5
@@ -70,7 +69,7 @@ async def submit_quiz(submission: schemas.QuizSubmit, db: Session = Depends(get_
     user_answers = [{"question_index": ans.question_index, "selected_answer": ans.selected_answer} 
                     for ans in submission.answers]
     
-    result = quiz_service.calculate_score(quiz.questions, user_answers)
+    result = QuizService.calculate_score(quiz.questions, user_answers)
     
     # Save attempt
     attempt = models.QuizAttempt(
@@ -18,7 +18,7 @@ class ArticleResponse(BaseModel):
     id: int
     url: str
     title: str
-    summary: str
+    summary: Optional[str] = None
     key_entities: Dict
     sections: List[str]
     quiz: List[Dict]
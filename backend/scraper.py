@@ -1,7 +1,19 @@
-import requests
-from bs4 import BeautifulSoup
 from typing import Dict, List, Optional
+from urllib.parse import unquote
 import re
+from services.gazetteer import get_gazetteer
+
+# Bump when extraction output changes, then run `python reextract.py`
+EXTRACTION_VERSION = 3
+
+# Entities are matched in the lead and the first section only (about 650 words),
+# which keeps matching well under a millisecond however long the article is
+ENTITY_TEXT_CHARS = 4000
+
+NON_ARTICLE_NAMESPACES = {
+    'File', 'Help', 'Category', 'Wikipedia', 'Template', 'Special', 'Portal',
+    'Talk', 'User', 'Module', 'Draft', 'MediaWiki', 'Image', 'Template talk'
+}
 
 class WikipediaScraper:
     def __init__(self, url: str):
@@ -15,19 +27,25 @@ class WikipediaScraper:
         pattern = r'https?://[a-z]{2,3}\.wikipedia\.org/wiki/.+'
         return bool(re.match(pattern, self.url))
     
-    def fetch_page(self) -> bool:
-        """Fetch the Wikipedia page"""
+    def fetch_html(self) -> Optional[bytes]:
+        """Fetch the raw HTML of the Wikipedia page"""
+        # Imported here so the app can start without paying for requests up front
+        import requests
         try:
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
             response = requests.get(self.url, headers=headers, timeout=10)
             response.raise_for_status()
-            self.soup = BeautifulSoup(response.content, 'html.parser')
-            return True
+            return response.content
         except Exception as e:
             print(f"Error fetching page: {e}")
-            return False
+            return None
+    
+    def parse(self, html: bytes) -> None:
+        """Parse raw HTML; CPU-bound, so the app runs it in the parse executor"""
+        from bs4 import BeautifulSoup
+        self.soup = BeautifulSoup(html, 'html.parser')
     
     def extract_title(self) -> str:
         """Extract article title"""
@@ -99,8 +117,40 @@ class WikipediaScraper:
             print(f"Error extracting sections: {e}")
             return []
     
-    def extract_entities(self) -> Dict[str, List[str]]:
-        """Extract key entities (simple implementation)"""
+    def extract_links(self) -> List[str]:
+        """Extract titles of linked Wikipedia articles, in page order"""
+        try:
+            content_div = self.soup.find('div', class_='mw-parser-output')
+            if not content_div:
+                return []
+            
+            links = []
+            seen = set()
+            for link in content_div.find_all('a', href=True):
+                href = link['href']
+                if not href.startswith('/wiki/'):
+                    continue
+                title = unquote(href[len('/wiki/'):].split('#')[0]).replace('_', ' ').strip()
+                # Skip file links, help pages, etc.
+                if not title or title.split(':', 1)[0] in NON_ARTICLE_NAMESPACES:
+                    continue
+                if title not in seen:
+                    seen.add(title)
+                    links.append(title)
+            return links
+        except Exception as e:
+            print(f"Error extracting links: {e}")
+            return []
+    
+    def extract_entities(self, text: str = "") -> Dict[str, List[str]]:
+        """Extract key entities, typed by the gazetteer when an index has been built"""
+        gazetteer = get_gazetteer()
+        if gazetteer is not None and text:
+            if len(text) > ENTITY_TEXT_CHARS:
+                text = text[:ENTITY_TEXT_CHARS].rsplit(" ", 1)[0]
+            # Types the index has no names for stay empty rather than being guessed
+            return gazetteer.extract(text, limit=5, exclude=self.title)
+        # Without an index (see build_gazetteer.py) fall back to the first linked names
         try:
             entities = {
                 'people': [],
@@ -150,21 +200,39 @@ class WikipediaScraper:
         text = text.replace('\n', ' ')
         return text.strip()
     
-    def scrape(self) -> Optional[Dict]:
-        """Main scraping method"""
+    def download(self) -> bytes:
+        """Validate the URL and fetch the page (network I/O only)"""
         if not self.validate_url():
             raise ValueError("Invalid Wikipedia URL")
         
-        if not self.fetch_page():
+        html = self.fetch_html()
+        if html is None:
             raise Exception("Failed to fetch Wikipedia page")
-        
+        return html
+    
+    def extract(self, html: bytes) -> Dict:
+        """Parse the page and extract every article field (CPU only)"""
+        self.parse(html)
+        title = self.extract_title()
+        summary = self.extract_summary()
+        content = self.extract_content()
         return {
-            'title': self.extract_title(),
-            'summary': self.extract_summary(),
-            'content': self.extract_content(),
+            'title': title,
+            'summary': summary,
+            'content': content,
             'sections': self.extract_sections(),
-            'key_entities': self.extract_entities()
+            'key_entities': self.extract_entities(content),
+            'links': self.extract_links()
         }
+    
+    def scrape(self) -> Optional[Dict]:
+        """Main scraping method"""
+        return self.extract(self.download())
+
+
+def extract_article(url: str, html: bytes) -> Dict:
+    """Extract article fields from already-fetched HTML (picklable entry point for worker processes)"""
+    return WikipediaScraper(url).extract(html)
 
 
 # Test function
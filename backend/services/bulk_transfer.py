@@ -0,0 +1,281 @@
+import zlib
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+import orjson
+from sqlalchemy import DateTime, insert, select, tuple_
+from sqlalchemy.orm import Session
+import models
+from database import SessionLocal
+
+# Record types in export order: quizzes must come before the attempts that reference them
+TABLES = {
+    "article": models.Article,
+    "quiz": models.Quiz,
+    "quiz_attempt": models.QuizAttempt,
+}
+
+DATETIME_COLUMNS = {
+    name: {column.name for column in model.__table__.columns if isinstance(column.type, DateTime)}
+    for name, model in TABLES.items()
+}
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+def parse_tables(value: Optional[str]) -> List[str]:
+    if not value:
+        return list(TABLES)
+    tables = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in tables if name not in TABLES]
+    if unknown:
+        raise ValueError(f"Unknown tables: {', '.join(unknown)} (expected {', '.join(TABLES)})")
+    # Keep dependency order regardless of how they were requested
+    return [name for name in TABLES if name in tables]
+
+
+def export_lines(db: Session, tables: List[str], chunk_size: int = 1000) -> Iterator[bytes]:
+    """Yield NDJSON records in chunks, streaming rows through a server-side cursor"""
+    for name in tables:
+        table = TABLES[name].__table__
+        result = db.execute(
+            select(table).order_by(table.c.id).execution_options(yield_per=chunk_size)
+        )
+        for rows in result.partitions():
+            yield b"".join(
+                orjson.dumps({"type": name, "data": row._asdict()}) + b"\n" for row in rows
+            )
+        result.close()
+
+
+def export_stream(tables: List[str], compress: bool = False, chunk_size: int = 1000) -> Iterator[bytes]:
+    """NDJSON export with its own session, optionally gzip-compressed"""
+    db = SessionLocal()
+    try:
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+        for chunk in export_lines(db, tables, chunk_size):
+            if compressor is None:
+                yield chunk
+            else:
+                data = compressor.compress(chunk)
+                if data:
+                    yield data
+        if compressor is not None:
+            yield compressor.flush()
+    finally:
+        db.close()
+
+
+class LineDecoder:
+    """Splits a (possibly gzip-compressed) byte stream into NDJSON lines"""
+
+    def __init__(self):
+        self.buffer = b""
+        self.decompressor = None
+        self.started = False
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        if not self.started and chunk:
+            self.started = True
+            if chunk.startswith(GZIP_MAGIC):
+                self.decompressor = zlib.decompressobj(47)
+        if self.decompressor is not None:
+            try:
+                chunk = self.decompressor.decompress(chunk)
+            except zlib.error as e:
+                raise ValueError(f"Invalid gzip data: {e}")
+        return self._split(chunk)
+
+    def finish(self) -> List[bytes]:
+        lines = []
+        if self.decompressor is not None:
+            try:
+                lines = self._split(self.decompressor.flush())
+            except zlib.error as e:
+                raise ValueError(f"Invalid gzip data: {e}")
+            if not self.decompressor.eof:
+                raise ValueError("Truncated gzip data")
+        rest, self.buffer = self.buffer, b""
+        return lines + ([rest] if rest.strip() else [])
+
+    def _split(self, data: bytes) -> List[bytes]:
+        self.buffer += data
+        lines = self.buffer.split(b"\n")
+        self.buffer = lines.pop()
+        return [line for line in lines if line.strip()]
+
+
+class BulkImporter:
+    """Imports NDJSON records in batches.
+
+    Articles are upserted on their URL and quizzes on their Wikipedia URL;
+    attempts are re-pointed at the imported quiz ids, and skipped when their
+    quiz is not part of the import or an identical attempt already exists.
+    """
+
+    def __init__(self, db: Session, batch_size: int = 1000):
+        self.db = db
+        self.batch_size = batch_size
+        self.pending: Dict[str, List[dict]] = {name: [] for name in TABLES}
+        self.quiz_ids: Dict[int, int] = {}
+        self.counts: Dict[str, int] = {name: 0 for name in TABLES}
+        # Attempts whose quiz was not in the import, so they cannot be re-pointed
+        self.orphaned_attempts = 0
+
+    def feed(self, lines: Iterable[bytes]) -> None:
+        for line in lines:
+            record = orjson.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("Each line must be a JSON object")
+            name = record.get("type")
+            if name not in TABLES:
+                raise ValueError(f"Unknown record type: {name}")
+            data = record.get("data")
+            if not isinstance(data, dict):
+                raise ValueError(f"A {name} record needs a data object")
+            for column in DATETIME_COLUMNS[name]:
+                value = data.get(column)
+                if value:
+                    if not isinstance(value, str):
+                        raise ValueError(f"{name}.{column} must be an ISO 8601 string")
+                    data[column] = datetime.fromisoformat(value)
+            batch = self.pending[name]
+            batch.append(data)
+            if len(batch) >= self.batch_size:
+                self.flush(name)
+
+    def finish(self) -> Dict[str, int]:
+        for name in TABLES:
+            self.flush(name)
+        return self.counts
+
+    def flush(self, name: str) -> None:
+        if name == "quiz_attempt":
+            # Attempts may reference quizzes still waiting in their batch
+            self.flush("quiz")
+        rows, self.pending[name] = self.pending[name], []
+        if not rows:
+            return
+        try:
+            written = getattr(self, f"_import_{name}")(rows)
+        except (TypeError, AttributeError) as e:
+            # Values of the wrong JSON type (a list for a URL, an object for an id, ...)
+            raise ValueError(f"Invalid {name} record: {e}")
+        self.db.commit()
+        self.counts[name] += written
+
+    def _upsert_insert(self, model):
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            return None
+        return dialect_insert(model)
+
+    def _import_article(self, rows: List[dict]) -> int:
+        # Deduplicate within the batch; ON CONFLICT cannot touch one row twice
+        by_url: Dict[str, dict] = {}
+        for row in rows:
+            by_url.setdefault(row["url"], {}).update((k, v) for k, v in row.items() if k != "id")
+        rows = list(by_url.values())
+        written = 0
+        if self._upsert_insert(models.Article) is not None:
+            # Records may carry different columns; each shape gets its own statement
+            shapes: Dict[tuple, List[dict]] = {}
+            for row in rows:
+                shapes.setdefault(tuple(sorted(row)), []).append(row)
+            for shape, shape_rows in shapes.items():
+                columns = [c for c in shape if c not in ("url", "version")]
+                if not columns:
+                    # A bare URL carries nothing to upsert (and ON CONFLICT DO UPDATE
+                    # rejects an empty SET; the NOT NULL title fails before DO NOTHING)
+                    continue
+                statement = self._upsert_insert(models.Article)
+                set_ = {column: statement.excluded[column] for column in columns}
+                # Rewritten rows get a new version (and so a new ETag), whatever the source had
+                set_["version"] = models.Article.__table__.c.version + 1
+                statement = statement.on_conflict_do_update(index_elements=["url"], set_=set_)
+                # RETURNING counts inserted and updated rows alike, on every driver
+                written += len(self.db.execute(statement.returning(models.Article.id), shape_rows).all())
+            return written
+        existing = {
+            article.url: article for article in
+            self.db.query(models.Article).filter(models.Article.url.in_(list(by_url)))
+        }
+        for row in rows:
+            article = existing.get(row["url"])
+            if article is None:
+                self.db.add(models.Article(**row))
+            else:
+                for column, value in row.items():
+                    if column != "version":
+                        setattr(article, column, value)
+                article.version += 1
+        return len(rows)
+
+    def _import_quiz(self, rows: List[dict]) -> int:
+        urls = {row["wikipedia_url"] for row in rows if row.get("wikipedia_url")}
+        existing = dict(
+            self.db.query(models.Quiz.wikipedia_url, models.Quiz.id)
+            .filter(models.Quiz.wikipedia_url.in_(urls))
+            .order_by(models.Quiz.id.desc())
+        ) if urls else {}
+
+        new_rows = []
+        duplicates = []
+        batch_urls = {}
+        updated = set()
+        for row in rows:
+            old_id = row.pop("id", None)
+            url = row.get("wikipedia_url")
+            quiz_id = existing.get(url)
+            if quiz_id is not None:
+                if self.db.query(models.Quiz).filter(models.Quiz.id == quiz_id).update(row):
+                    updated.add(quiz_id)
+                self.quiz_ids[old_id] = quiz_id
+            elif url and url in batch_urls:
+                duplicates.append((old_id, url))
+            else:
+                if url:
+                    batch_urls[url] = old_id
+                new_rows.append((old_id, row))
+        if new_rows:
+            result = self.db.execute(
+                insert(models.Quiz).returning(models.Quiz.id, sort_by_parameter_order=True),
+                [row for _, row in new_rows]
+            )
+            for (old_id, _), new_id in zip(new_rows, result.scalars()):
+                self.quiz_ids[old_id] = new_id
+        for old_id, url in duplicates:
+            self.quiz_ids[old_id] = self.quiz_ids[batch_urls[url]]
+        return len(updated) + len(new_rows)
+
+    def _import_quiz_attempt(self, rows: List[dict]) -> int:
+        mapped = []
+        for row in rows:
+            row.pop("id", None)
+            quiz_id = self.quiz_ids.get(row.get("quiz_id"))
+            if quiz_id is None:
+                self.orphaned_attempts += 1
+                continue
+            row["quiz_id"] = quiz_id
+            mapped.append(row)
+        rows = mapped
+        if not rows:
+            return 0
+        keys = {(row["quiz_id"], row.get("completed_at")) for row in rows}
+        seen = {
+            tuple(row) for row in
+            self.db.query(models.QuizAttempt.quiz_id, models.QuizAttempt.completed_at, models.QuizAttempt.user_name)
+            .filter(tuple_(models.QuizAttempt.quiz_id, models.QuizAttempt.completed_at).in_(list(keys)))
+        }
+        new_rows = []
+        for row in rows:
+            key = (row["quiz_id"], row.get("completed_at"), row.get("user_name"))
+            if key not in seen:
+                seen.add(key)
+                new_rows.append(row)
+        if new_rows:
+            self.db.execute(insert(models.QuizAttempt), new_rows)
+        return len(new_rows)
@@ -0,0 +1,43 @@
+import os
+from typing import Optional
+import orjson
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+import models
+import schemas
+
+load_dotenv()
+
+# Opt-in: build read responses straight from row tuples with orjson instead of
+# constructing Pydantic models per request. benchmarks/bench_serialization.py
+# checks the output against the schemas.
+FAST_RESPONSES = os.getenv("FAST_RESPONSES", "0").lower() in ("1", "true", "yes")
+
+ARTICLE_FIELDS = tuple(schemas.ArticleResponse.model_fields)
+LIST_ITEM_FIELDS = tuple(schemas.ArticleListItem.model_fields)
+
+ARTICLE_COLUMNS = [getattr(models.Article, field) for field in ARTICLE_FIELDS]
+LIST_ITEM_COLUMNS = [getattr(models.Article, field) for field in LIST_ITEM_FIELDS]
+
+# Matches Pydantic's JSON output for naive and UTC datetimes
+ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+def dumps(obj) -> bytes:
+    return orjson.dumps(obj, option=ORJSON_OPTIONS)
+
+
+def article_row(db: Session, article_id: int) -> Optional[tuple]:
+    """Fetch just the columns ArticleResponse needs (plus `version` for the ETag)"""
+    return db.query(*ARTICLE_COLUMNS, models.Article.version).filter(models.Article.id == article_id).first()
+
+
+def serialize_article_row(row: tuple) -> bytes:
+    # zip stops at the response fields, leaving out the trailing version column
+    return dumps(dict(zip(ARTICLE_FIELDS, row)))
+
+
+def serialize_article_list(db: Session) -> bytes:
+    """Serialize the quiz history list from row tuples in one orjson call"""
+    rows = db.query(*LIST_ITEM_COLUMNS).order_by(models.Article.created_at.desc()).all()
+    return dumps([dict(zip(LIST_ITEM_FIELDS, row)) for row in rows])
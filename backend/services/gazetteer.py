@@ -0,0 +1,249 @@
+import mmap
+import os
+import re
+import struct
+import threading
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+ENTITY_TYPES = ("people", "organizations", "locations")
+
+GAZETTEER_PATH = os.getenv("GAZETTEER_PATH", "./gazetteer.bin")
+
+MAGIC = b"WQGAZ001"
+# magic, then counts: states, transitions, entities, vocabulary bytes, name bytes
+HEADER = struct.Struct("<8s5Q")
+
+# Transition keys pack (state, word id) into one sorted uint64
+WORD_BITS = 24
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Category keywords that type an article; checked in order, people first
+CATEGORY_RULES = [
+    ("people", re.compile(
+        r"\b(births|deaths|living people|people|politicians|scientists|writers|poets|novelists|"
+        r"actors|actresses|singers|musicians|composers|painters|philosophers|mathematicians|"
+        r"physicists|chemists|engineers|inventors|monarchs|presidents|generals|players)\b", re.I)),
+    ("organizations", re.compile(
+        r"\b(companies|organizations|organisations|universities|colleges|schools|agencies|"
+        r"parties|corporations|institutions|foundations|manufacturers|publishers|"
+        r"brands|bands|clubs|teams|armies|navies|ministries|councils|societies)\b", re.I)),
+    ("locations", re.compile(
+        r"\b(cities|towns|villages|countries|states|provinces|regions|capitals|populated places|"
+        r"municipalities|counties|districts|continents|islands|rivers|lakes|mountains|"
+        r"territories|peninsulas|seas)\b", re.I)),
+]
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text)
+
+
+def classify_categories(categories: List[str]) -> Optional[str]:
+    """Entity type implied by an article's Wikipedia categories, if any"""
+    for entity_type, pattern in CATEGORY_RULES:
+        if any(pattern.search(category) for category in categories):
+            return entity_type
+    return None
+
+
+def build_gazetteer(entries: List[Tuple[str, str, str]], path: str) -> int:
+    """Compile (surface form, canonical name, type) entries into an index file.
+
+    The index is a word-level Aho-Corasick automaton stored as flat arrays so
+    it can be memory-mapped at startup. Returns the number of patterns.
+    """
+    vocab: Dict[str, int] = {}
+    names: List[str] = []
+    name_ids: Dict[Tuple[str, str], int] = {}
+    entity_types: List[int] = []
+    goto: List[Dict[int, int]] = [{}]
+    output: List[int] = [0]
+    lengths: List[int] = [0]
+
+    patterns = 0
+    for surface, name, entity_type in entries:
+        words = tokenize(surface)
+        if not words or entity_type not in ENTITY_TYPES:
+            continue
+        key = (name, entity_type)
+        if key not in name_ids:
+            name_ids[key] = len(names)
+            names.append(name)
+            entity_types.append(ENTITY_TYPES.index(entity_type))
+        state = 0
+        for word in words:
+            word_id = vocab.setdefault(word, len(vocab) + 1)
+            next_state = goto[state].get(word_id)
+            if next_state is None:
+                next_state = len(goto)
+                goto[state][word_id] = next_state
+                goto.append({})
+                output.append(0)
+                lengths.append(0)
+            state = next_state
+        if output[state] == 0:
+            output[state] = name_ids[key] + 1
+            lengths[state] = len(words)
+            patterns += 1
+
+    if len(vocab) >= 1 << WORD_BITS:
+        raise ValueError("Gazetteer vocabulary is too large")
+
+    # Breadth-first pass for failure links and dictionary-suffix links
+    fail = [0] * len(goto)
+    dict_link = [0] * len(goto)
+    queue = deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        for word_id, child in goto[state].items():
+            queue.append(child)
+            f = fail[state]
+            while f and word_id not in goto[f]:
+                f = fail[f]
+            fail[child] = goto[f].get(word_id, 0) if goto[f].get(word_id, 0) != child else 0
+            dict_link[child] = fail[child] if output[fail[child]] else dict_link[fail[child]]
+
+    transitions = sorted(
+        ((state << WORD_BITS) | word_id, child)
+        for state, children in enumerate(goto)
+        for word_id, child in children.items()
+    )
+
+    vocab_bytes = "\n".join(sorted(vocab, key=vocab.get)).encode()
+    name_bytes = "\n".join(names).encode()
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(goto), len(transitions), len(names), len(vocab_bytes), len(name_bytes)))
+        f.write(struct.pack(f"<{len(transitions)}Q", *(key for key, _ in transitions)))
+        f.write(struct.pack(f"<{len(transitions)}I", *(child for _, child in transitions)))
+        f.write(struct.pack(f"<{len(goto)}I", *fail))
+        f.write(struct.pack(f"<{len(goto)}I", *output))
+        f.write(struct.pack(f"<{len(goto)}I", *dict_link))
+        f.write(struct.pack(f"<{len(goto)}I", *lengths))
+        f.write(bytes(entity_types))
+        f.write(vocab_bytes)
+        f.write(name_bytes)
+    # Atomic swap: running processes keep their mapping of the old file
+    os.replace(tmp_path, path)
+    return patterns
+
+
+class Gazetteer:
+    """Memory-mapped gazetteer index that types entities in one pass over the text"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, states, transitions, entities, vocab_size, names_size = HEADER.unpack_from(self.mm)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a gazetteer index")
+
+        view = memoryview(self.mm)
+        offset = HEADER.size
+
+        def take(count: int, width: int, fmt: str):
+            nonlocal offset
+            array = view[offset:offset + count * width].cast(fmt)
+            offset += count * width
+            return array
+
+        self.keys = take(transitions, 8, "Q")
+        self.targets = take(transitions, 4, "I")
+        self.fail = take(states, 4, "I")
+        self.output = take(states, 4, "I")
+        self.dict_link = take(states, 4, "I")
+        self.lengths = take(states, 4, "I")
+        self.types = take(entities, 1, "B")
+        vocab = bytes(view[offset:offset + vocab_size]).decode().split("\n") if vocab_size else []
+        offset += vocab_size
+        self.names = bytes(view[offset:offset + names_size]).decode().split("\n") if names_size else []
+        self.vocab = {word: index + 1 for index, word in enumerate(vocab)}
+        self.transition_count = transitions
+        # Most steps start from the root, so its transitions get a dict of their own
+        root_end = bisect_left(self.keys, 1 << WORD_BITS)
+        self.root = {key: target for key, target in zip(self.keys[:root_end], self.targets[:root_end])}
+
+    def _step(self, state: int, word_id: int) -> int:
+        keys, targets, fail, count = self.keys, self.targets, self.fail, self.transition_count
+        while True:
+            key = (state << WORD_BITS) | word_id
+            index = bisect_left(keys, key)
+            if index < count and keys[index] == key:
+                return targets[index]
+            if state == 0:
+                return 0
+            state = fail[state]
+
+    def matches(self, text: str) -> List[Tuple[int, int, int]]:
+        """All (start token, end token, entity) matches, leftmost-longest and non-overlapping"""
+        vocab_get, root_get, step = self.vocab.get, self.root.get, self._step
+        output, dict_link, lengths = self.output, self.dict_link, self.lengths
+        found = []
+        state = 0
+        for position, word in enumerate(TOKEN_PATTERN.findall(text)):
+            word_id = vocab_get(word)
+            if word_id is None:
+                # Unknown words can never continue a pattern
+                state = 0
+                continue
+            state = step(state, word_id) if state else root_get(word_id, 0)
+            if not state:
+                continue
+            match_state = state if output[state] else dict_link[state]
+            while match_state:
+                end = position + 1
+                found.append((end - lengths[match_state], end, output[match_state] - 1))
+                match_state = dict_link[match_state]
+
+        found.sort(key=lambda match: (match[0], match[0] - match[1]))
+        result = []
+        last_end = 0
+        for start, end, entity in found:
+            if start >= last_end:
+                result.append((start, end, entity))
+                last_end = end
+        return result
+
+    def extract(self, text: str, limit: int = 5, exclude: Optional[str] = None) -> Dict[str, List[str]]:
+        """Most frequent entities of each type in `text`"""
+        counts: Dict[int, int] = {}
+        first_seen: Dict[int, int] = {}
+        for start, _, entity in self.matches(text):
+            counts[entity] = counts.get(entity, 0) + 1
+            first_seen.setdefault(entity, start)
+
+        entities = {entity_type: [] for entity_type in ENTITY_TYPES}
+        for entity in sorted(counts, key=lambda e: (-counts[e], first_seen[e])):
+            name = self.names[entity]
+            bucket = entities[ENTITY_TYPES[self.types[entity]]]
+            if name != exclude and len(bucket) < limit:
+                bucket.append(name)
+        return entities
+
+
+_gazetteer: Optional[Gazetteer] = None
+_loaded = False
+_lock = threading.Lock()
+
+
+def get_gazetteer() -> Optional[Gazetteer]:
+    """The process-wide gazetteer, or None if no index has been built yet"""
+    global _gazetteer, _loaded
+    if not _loaded:
+        with _lock:
+            if not _loaded:
+                if os.path.exists(GAZETTEER_PATH):
+                    try:
+                        _gazetteer = Gazetteer(GAZETTEER_PATH)
+                        print(f"Loaded gazetteer with {len(_gazetteer.names)} entities")
+                    except Exception as e:
+                        print(f"Error loading gazetteer: {e}")
+                _loaded = True
+    return _gazetteer
@@ -0,0 +1,115 @@
+import math
+import threading
+from array import array
+from collections import defaultdict
+from typing import Dict, List
+from sqlalchemy.orm import Session
+import models
+
+
+class LinkGraph:
+    """In-memory link graph over every scraped article, with integer node ids.
+
+    Each scraped article's outlinks are persisted in `article_links`; this class
+    keeps them as compact `array('I')` adjacency lists (outlinks for scraped
+    articles, inlinks for every node) and ranks related topics by graph
+    proximity without any network or LLM calls.
+    """
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.titles: List[str] = []
+        self.outlinks: Dict[int, array] = {}
+        self.inlinks: List[array] = []
+        self.last_row_id = 0
+        self.lock = threading.RLock()
+
+    def _node(self, title: str) -> int:
+        node = self.ids.get(title)
+        if node is None:
+            node = len(self.titles)
+            self.ids[title] = node
+            self.titles.append(title)
+            self.inlinks.append(array('I'))
+        return node
+
+    def add_article(self, title: str, links: List[str]) -> None:
+        """Add (or replace) an article's outlinks"""
+        with self.lock:
+            source = self._node(title)
+            for target in self.outlinks.get(source, ()):
+                inlinks = self.inlinks[target]
+                del inlinks[inlinks.index(source)]
+            targets = array('I', (self._node(link) for link in links if link != title))
+            self.outlinks[source] = targets
+            for target in targets:
+                self.inlinks[target].append(source)
+
+    def refresh(self, db: Session) -> None:
+        """Load articles other workers have added since the last refresh"""
+        rows = db.query(models.ArticleLinks.id, models.ArticleLinks.title, models.ArticleLinks.links)\
+            .filter(models.ArticleLinks.id > self.last_row_id)\
+            .order_by(models.ArticleLinks.id)\
+            .all()
+        with self.lock:
+            for row_id, title, links in rows:
+                self.add_article(title, links or [])
+                self.last_row_id = max(self.last_row_id, row_id)
+
+    def record(self, db: Session, title: str, links: List[str]) -> None:
+        """Add an article to the graph and stage its links for the caller's commit"""
+        self.refresh(db)
+        # Whether the row exists is decided by the database, not the in-memory graph:
+        # redirect URLs can race to insert the same title, and a failed commit must not
+        # leave the title looking stored
+        dialect = db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+            db.execute(
+                insert(models.ArticleLinks)
+                .values(title=title, links=links)
+                .on_conflict_do_nothing(index_elements=["title"])
+            )
+        elif not db.query(models.ArticleLinks.id).filter(models.ArticleLinks.title == title).first():
+            db.add(models.ArticleLinks(title=title, links=links))
+        with self.lock:
+            self.add_article(title, links)
+
+    def related(self, title: str, limit: int = 5) -> List[str]:
+        """Rank topics close to `title` in the link graph"""
+        with self.lock:
+            source = self.ids.get(title)
+            if source is None:
+                return []
+            outlinks = self.outlinks.get(source, array('I'))
+            scores: Dict[int, float] = defaultdict(float)
+
+            # Links near the top of the article (the lead) matter most
+            for rank, target in enumerate(outlinks):
+                scores[target] += 1.0 / (1 + rank / 10)
+                # Reciprocal links are a strong signal of a close topic
+                if source in self.outlinks.get(target, ()):
+                    scores[target] += 2.0
+
+            # Co-citation: topics that other articles link to alongside this one
+            for citing in self.inlinks[source]:
+                for target in self.outlinks.get(citing, ()):
+                    scores[target] += 1.0
+
+            # Bibliographic coupling: scraped articles that link to the same topics
+            coupling: Dict[int, int] = defaultdict(int)
+            for target in outlinks:
+                for citing in self.inlinks[target]:
+                    coupling[citing] += 1
+            for other, shared in coupling.items():
+                scores[other] += 5.0 * shared / math.sqrt(len(outlinks) * len(self.outlinks[other]))
+
+            scores.pop(source, None)
+            ranked = sorted(scores, key=scores.__getitem__, reverse=True)
+            return [self.titles[node] for node in ranked[:limit]]
+
+
+link_graph = LinkGraph()
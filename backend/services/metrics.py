@@ -0,0 +1,19 @@
+from typing import Dict
+from services.shared_store import get_shared_store
+
+PREFIX = "metrics:"
+
+
+def record(name: str, amount: int = 1) -> None:
+    """Increment a counter shared by every worker process"""
+    try:
+        get_shared_store().incr(PREFIX + name, amount)
+    except Exception as e:
+        # Metrics must never fail the request they describe
+        print(f"Error recording metric {name}: {e}")
+
+
+def snapshot() -> Dict[str, int]:
+    """Current counters, aggregated across workers"""
+    counters = get_shared_store().counters(PREFIX)
+    return {key[len(PREFIX):]: value for key, value in sorted(counters.items())}
@@ -0,0 +1,70 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from typing import Dict, Optional
+import orjson
+from dotenv import load_dotenv
+from scraper import extract_article
+from services.gazetteer import get_gazetteer
+
+load_dotenv()
+
+
+def extract_serialized(url: str, html: bytes) -> bytes:
+    # Runs in a worker process; orjson bytes pickle far smaller and faster than nested dicts
+    return orjson.dumps(extract_article(url, html))
+
+
+class ParseExecutor:
+    """Runs HTML parsing and text extraction in a bounded pool of worker processes.
+
+    BeautifulSoup and the cleaning regexes hold the GIL, so parsing a large
+    article in the web process stalls every other request on that worker.
+    With `workers=0` extraction runs inline instead.
+    """
+
+    def __init__(self, workers: int, max_pending: Optional[int] = None, timeout: float = 60):
+        self.workers = workers
+        self.timeout = timeout
+        self.pending = threading.BoundedSemaphore(max_pending or max(1, workers) * 4)
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # Created on first use so cold starts do not pay for spawning workers
+        with self.lock:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=get_context("spawn"),
+                    initializer=get_gazetteer
+                )
+            return self.pool
+
+    def extract(self, url: str, html: bytes) -> Dict:
+        """Extract article fields from raw HTML"""
+        if self.workers <= 0:
+            return extract_article(url, html)
+        with self.pending:
+            pool = self._get_pool()
+            try:
+                result = pool.submit(extract_serialized, url, html).result(timeout=self.timeout)
+            except BrokenProcessPool:
+                print("Parse worker died, restarting pool")
+                self.shutdown()
+                return extract_article(url, html)
+        return orjson.loads(result)
+
+    def shutdown(self) -> None:
+        with self.lock:
+            if self.pool is not None:
+                self.pool.shutdown(wait=False, cancel_futures=True)
+                self.pool = None
+
+
+# Leave a core for the web process; single-core boxes parse inline
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", min(2, (os.cpu_count() or 1) - 1)))
+
+parse_executor = ParseExecutor(workers=PARSE_WORKERS)
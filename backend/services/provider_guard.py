@@ -0,0 +1,282 @@
+import os
+import random
+import threading
+import time
+from typing import Callable, Optional, TypeVar
+from dotenv import load_dotenv
+
+load_dotenv()
+
+T = TypeVar("T")
+
+
+class ProviderUnavailableError(Exception):
+    """Raised when a provider call is rejected locally instead of being sent"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = max(1, int(retry_after + 0.999))
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `rate_per_minute`"""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        if now < self.paused_until:
+            self.updated_at = now
+            return
+        start = max(self.updated_at, self.paused_until)
+        self.tokens = min(self.capacity, self.tokens + (now - start) * self.rate)
+        self.updated_at = now
+
+    def reserve(self, amount: float) -> float:
+        """Take `amount` tokens, returning how long the caller must wait before using them"""
+        amount = min(amount, self.capacity)
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= amount
+            # Refill only restarts once the pause ends, so the deficit is paid off after it
+            return max(0.0, self.paused_until - now) + max(0.0, -self.tokens) / self.rate
+
+    def refund(self, amount: float) -> None:
+        """Give back tokens reserved by a call that never went out"""
+        with self.lock:
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+    def pause(self, seconds: float) -> None:
+        """Stop refilling for `seconds` (used when the provider sends Retry-After)"""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens = min(self.tokens, 0.0)
+            self.paused_until = max(self.paused_until, now + seconds)
+
+
+class CircuitBreaker:
+    """Fails fast after `failure_threshold` consecutive provider failures"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    def before_call(self) -> None:
+        with self.lock:
+            if self.state == self.CLOSED:
+                return
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+            if self.state == self.OPEN and remaining <= 0:
+                self.state = self.HALF_OPEN
+                self.trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return
+            raise ProviderUnavailableError(
+                "AI provider is unavailable, failing fast", max(remaining, 1.0)
+            )
+
+    def release_trial(self) -> None:
+        """Let another caller probe the provider if the trial never went out"""
+        with self.lock:
+            self.trial_in_flight = False
+
+    def record_success(self) -> None:
+        with self.lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    print(f"Circuit breaker opened after {self.failures} failures")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class ProviderGuard:
+    """Client-side rate limiting, retries and circuit breaking for one LLM provider"""
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        max_retries: int = 3,
+        max_queue: int = 8,
+        max_wait: float = 20.0,
+        base_backoff: float = 0.5,
+        max_backoff: float = 10.0,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.in_flight = 0
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ProviderGuard":
+        # Provider limits are per API key, so split them across worker processes
+        workers = max(1, int(os.getenv("WEB_CONCURRENCY", 1)))
+        return cls(
+            requests_per_minute=float(os.getenv("GROQ_REQUESTS_PER_MINUTE", 30)) / workers,
+            tokens_per_minute=float(os.getenv("GROQ_TOKENS_PER_MINUTE", 6000)) / workers,
+            max_retries=int(os.getenv("GROQ_MAX_RETRIES", 3)),
+            max_queue=int(os.getenv("GROQ_MAX_QUEUE", 8)),
+            max_wait=float(os.getenv("GROQ_MAX_WAIT", 20)),
+            breaker=CircuitBreaker(
+                failure_threshold=int(os.getenv("GROQ_BREAKER_THRESHOLD", 5)),
+                reset_timeout=float(os.getenv("GROQ_BREAKER_RESET", 30)),
+            ),
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        return self.in_flight
+
+    def call(self, fn: Callable[[], T], estimated_tokens: int) -> T:
+        """Run `fn` under the rate limits, retrying throttled and transient failures"""
+        with self.lock:
+            if self.in_flight >= self.max_queue:
+                raise ProviderUnavailableError(
+                    f"AI provider queue is full ({self.in_flight} requests waiting)",
+                    self.max_wait,
+                )
+            self.in_flight += 1
+        try:
+            return self._call_with_retries(fn, estimated_tokens)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def _acquire(self, estimated_tokens: int) -> None:
+        wait = max(
+            self.request_bucket.reserve(1),
+            self.token_bucket.reserve(estimated_tokens),
+        )
+        if wait > self.max_wait:
+            self.request_bucket.refund(1)
+            self.token_bucket.refund(estimated_tokens)
+            raise ProviderUnavailableError("AI provider rate limit reached", wait)
+        if wait > 0:
+            time.sleep(wait)
+
+    def _call_with_retries(self, fn: Callable[[], T], estimated_tokens: int) -> T:
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            try:
+                self._acquire(estimated_tokens)
+            except ProviderUnavailableError:
+                self.breaker.release_trial()
+                raise
+            try:
+                result = fn()
+            except Exception as e:
+                status = get_status_code(e)
+                retry_after = get_retry_after(e)
+                if status == 429:
+                    # Throttling means the provider is up; slow everyone down instead of tripping
+                    self.breaker.record_success()
+                    self.request_bucket.pause(retry_after or self.base_backoff)
+                elif is_transient(e, status):
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                    raise
+
+                if attempt >= self.max_retries:
+                    if status == 429:
+                        raise ProviderUnavailableError(
+                            "AI provider rate limit reached", retry_after or self.max_backoff
+                        ) from e
+                    raise
+
+                delay = random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt))
+                if retry_after is not None:
+                    delay = max(delay, retry_after + random.uniform(0, self.base_backoff))
+                if delay > self.max_wait:
+                    raise ProviderUnavailableError("AI provider is throttling requests", delay) from e
+                print(f"Provider call failed ({status or type(e).__name__}), retrying in {delay:.2f}s")
+                time.sleep(delay)
+                attempt += 1
+            else:
+                self.breaker.record_success()
+                self._refund_unused(result, estimated_tokens)
+                return result
+
+    def _refund_unused(self, result, estimated_tokens: int) -> None:
+        # Calls reserve their worst case (prompt + max_tokens); give back what was not used
+        used = getattr(getattr(result, "usage", None), "total_tokens", None)
+        if isinstance(used, int) and used < estimated_tokens:
+            self.token_bucket.refund(estimated_tokens - used)
+
+
+def get_status_code(error: Exception) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """Read Retry-After (seconds) from a provider error response, if present"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after")
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+def is_transient(error: Exception, status: Optional[int]) -> bool:
+    if status is not None:
+        return status >= 500 or status == 408
+    # Timeouts and connection errors carry no status code
+    name = type(error).__name__
+    return "Timeout" in name or "Connection" in name
+
+
+def estimate_tokens(prompt: str, max_tokens: int) -> int:
+    """Rough token count for rate limiting (~4 characters per token)"""
+    return len(prompt) // 4 + max_tokens
+
+
+_guard: Optional[ProviderGuard] = None
+_guard_lock = threading.Lock()
+
+
+def get_provider_guard() -> ProviderGuard:
+    """Process-wide guard shared by every Groq client"""
+    global _guard
+    if _guard is None:
+        with _guard_lock:
+            if _guard is None:
+                _guard = ProviderGuard.from_env()
+    return _guard
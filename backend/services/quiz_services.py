@@ -1,8 +1,8 @@
 import os
 from typing import List, Dict
-from groq import Groq
 from dotenv import load_dotenv
 import json
+from services.provider_guard import ProviderUnavailableError, get_provider_guard, estimate_tokens
 
 load_dotenv()
 
@@ -12,7 +12,22 @@ class QuizService:
         if not api_key:
             raise ValueError("GROQ_API_KEY not found in environment variables")
         
-        self.client = Groq(api_key=api_key)
+        self.api_key = api_key
+        self._client = None
+        self.guard = get_provider_guard()
+    
+    @property
+    def client(self):
+        """Groq client, created on first use to keep the SDK off the startup path"""
+        if self._client is None:
+            from groq import Groq
+            # Retries are handled by the provider guard so Retry-After and backoff are applied once
+            self._client = Groq(
+                api_key=self.api_key,
+                timeout=float(os.getenv("GROQ_TIMEOUT", 30)),
+                max_retries=0
+            )
+        return self._client
     
     def generate_quiz(self, topic: str, content: str, num_questions: int = 5) -> List[Dict]:
         """Generate quiz questions using Groq AI"""
@@ -45,7 +60,7 @@ Requirements:
 Generate the questions now:"""
 
         try:
-            response = self.client.chat.completions.create(
+            response = self.guard.call(lambda: self.client.chat.completions.create(
                 model="llama-3.3-70b-versatile",  # Fast and accurate Groq model
                 messages=[
                     {
@@ -61,7 +76,7 @@ Generate the questions now:"""
                 max_tokens=2000,
                 top_p=1,
                 stream=False
-            )
+            ), estimated_tokens=estimate_tokens(prompt, 2000))
             
             response_text = response.choices[0].message.content.strip()
             
@@ -118,6 +133,8 @@ Generate the questions now:"""
             print(f"JSON parsing error: {e}")
             print(f"Full response text: {response_text}")
             raise ValueError(f"Failed to parse AI response as JSON: {str(e)}")
+        except ProviderUnavailableError:
+            raise
         except Exception as e:
             print(f"Error generating quiz: {e}")
             raise ValueError(f"Failed to generate quiz: {str(e)}")
@@ -152,4 +169,14 @@ Generate the questions now:"""
             "correct_answers": correct_count,
             "total_questions": total,
             "results": results
-        }
\ No newline at end of file
+        }
+
+
+_quiz_service = None
+
+def get_quiz_service() -> QuizService:
+    """Shared QuizService, created on the first request that needs it"""
+    global _quiz_service
+    if _quiz_service is None:
+        _quiz_service = QuizService()
+    return _quiz_service
\ No newline at end of file
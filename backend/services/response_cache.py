@@ -0,0 +1,158 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+from dotenv import load_dotenv
+from services.shared_store import SharedStore, Value, get_shared_store
+from scraper import EXTRACTION_VERSION
+
+load_dotenv()
+
+# Bump when the serialized shape of a quiz changes so clients drop old copies
+RESPONSE_VERSION = 1
+
+CACHE_CONTROL = f"public, max-age={int(os.getenv('QUIZ_CACHE_MAX_AGE', 300))}"
+
+# Shared copies expire so the store does not grow with every quiz ever read
+SHARED_TTL = int(os.getenv("QUIZ_CACHE_SHARED_TTL", 86400))
+
+
+def make_etag(quiz_id: int, created_at, version: int) -> str:
+    """Strong ETag from the quiz id, creation time and stored version (no body needed)"""
+    created = int(created_at.timestamp() * 1000) if created_at else 0
+    return f'"q{quiz_id}-{created}-{version}-v{RESPONSE_VERSION}.{EXTRACTION_VERSION}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Compare an If-None-Match header against an ETag (weak comparison, RFC 9110)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """Thread-safe LRU of pre-serialized JSON bodies keyed by quiz id.
+
+    With a shared store (multi-worker mode) entries are also written there so
+    every worker can serve them. Imports and re-extraction bump a shared epoch
+    that is part of every shared key, so all old entries stop being read. A
+    single quiz is invalidated by overwriting its shared entry with a
+    tombstone and appending its id to a short event log, which the other
+    workers replay to drop their local copies.
+    """
+
+    EPOCH_KEY = "quiz_cache:epoch"
+    EVENTS_KEY = "quiz_cache:events"
+    # Event log entries outlive any worker that is still serving requests
+    EVENT_TTL = 3600
+    # A worker this far behind clears its local copies instead of replaying
+    MAX_REPLAY = 256
+    TOMBSTONE = b"-"
+    # Long enough to outlast a request that read the quiz before it was deleted
+    TOMBSTONE_TTL = 300
+
+    def __init__(self, max_entries: int = 256, store: Optional[SharedStore] = None):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[int, Tuple[str, bytes]]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.store = store if store is not None and store.is_shared else None
+        self.epoch = None
+        self.events_seen = None
+
+    def _shared_key(self, quiz_id: int) -> str:
+        epoch = self.epoch.decode() if self.epoch is not None else "0"
+        # Versioned too, so a deploy that changes the body never reads older entries
+        return f"quiz_cache:v{RESPONSE_VERSION}.{EXTRACTION_VERSION}:{epoch}:{quiz_id}"
+
+    def _sync(self) -> None:
+        """Apply invalidations made by other workers since the last request"""
+        raw = self.store.get(self.EVENTS_KEY)
+        events = int(raw) if raw is not None else 0
+        if events == self.events_seen:
+            return
+        dropped = None
+        if self.events_seen is not None and 0 < events - self.events_seen <= self.MAX_REPLAY:
+            dropped = []
+            for event in range(self.events_seen + 1, events + 1):
+                quiz_id = self.store.get(f"{self.EVENTS_KEY}:{event}")
+                if quiz_id is None or quiz_id == b"*":
+                    # Expired, not yet written, or an invalidate_all
+                    dropped = None
+                    break
+                dropped.append(int(quiz_id))
+        with self.lock:
+            if dropped is None:
+                self.entries.clear()
+            else:
+                for quiz_id in dropped:
+                    self.entries.pop(quiz_id, None)
+        if dropped is None:
+            self.epoch = self.store.get(self.EPOCH_KEY)
+        self.events_seen = events
+
+    def _log_event(self, value: Value) -> None:
+        event = self.store.incr(self.EVENTS_KEY)
+        self.store.set(f"{self.EVENTS_KEY}:{event}", value, ttl=self.EVENT_TTL)
+
+    def get(self, quiz_id: int) -> Optional[Tuple[str, bytes]]:
+        if self.store is not None:
+            self._sync()
+        with self.lock:
+            entry = self.entries.get(quiz_id)
+            if entry is not None:
+                self.entries.move_to_end(quiz_id)
+                return entry
+        if self.store is not None:
+            raw = self.store.get(self._shared_key(quiz_id))
+            if raw is not None and raw != self.TOMBSTONE:
+                etag, body = raw.split(b"\n", 1)
+                entry = (etag.decode(), body)
+                self._put_local(quiz_id, entry)
+        return entry
+
+    def _put_local(self, quiz_id: int, entry: Tuple[str, bytes]) -> None:
+        if self.max_entries <= 0:
+            return
+        with self.lock:
+            self.entries[quiz_id] = entry
+            self.entries.move_to_end(quiz_id)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def put(self, quiz_id: int, etag: str, body: bytes) -> None:
+        if self.store is not None:
+            key = self._shared_key(quiz_id)
+            # Never overwrite: a tombstone left by a concurrent delete must win
+            if not self.store.add(key, etag.encode() + b"\n" + body, ttl=SHARED_TTL) \
+                    and self.store.get(key) == self.TOMBSTONE:
+                return
+        self._put_local(quiz_id, (etag, body))
+
+    def invalidate_all(self) -> None:
+        with self.lock:
+            self.entries.clear()
+        if self.store is not None:
+            self.store.incr(self.EPOCH_KEY)
+            self._log_event("*")
+
+    def invalidate(self, quiz_id: int) -> None:
+        with self.lock:
+            self.entries.pop(quiz_id, None)
+        if self.store is not None:
+            self._sync()
+            self.store.set(self._shared_key(quiz_id), self.TOMBSTONE, ttl=self.TOMBSTONE_TTL)
+            self._log_event(quiz_id)
+
+
+quiz_response_cache = ResponseCache(
+    max_entries=int(os.getenv("QUIZ_CACHE_SIZE", 256)),
+    store=get_shared_store()
+)
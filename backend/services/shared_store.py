@@ -0,0 +1,304 @@
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, Optional, Union
+from dotenv import load_dotenv
+
+load_dotenv()
+
+Value = Union[bytes, str, int]
+
+
+class LockTimeoutError(TimeoutError):
+    """Raised when a shared lock could not be acquired in time"""
+
+
+class SharedStore(ABC):
+    """Key/value store shared by every worker process (cache entries, locks, counters)"""
+
+    # False for stores that only live inside one process
+    is_shared = True
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Value, ttl: Optional[float] = None) -> None:
+        ...
+
+    @abstractmethod
+    def add(self, key: str, value: Value, ttl: Optional[float] = None) -> bool:
+        """Set `key` only if it does not exist; returns whether it was set"""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def delete_if(self, key: str, value: Value) -> bool:
+        """Delete `key` only if it still holds `value`"""
+
+    @abstractmethod
+    def incr(self, key: str, amount: int = 1) -> int:
+        ...
+
+    @abstractmethod
+    def counters(self, prefix: str) -> Dict[str, int]:
+        """All integer counters whose key starts with `prefix`"""
+
+    @contextmanager
+    def lock(self, name: str, timeout: float = 120, wait: float = 120):
+        """Cross-process mutex; expires after `timeout` in case the holder dies"""
+        key = f"lock:{name}"
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + wait
+        delay = 0.01
+        while not self.add(key, token, ttl=timeout):
+            if time.monotonic() >= deadline:
+                raise LockTimeoutError(f"Timed out waiting for lock {name}")
+            time.sleep(delay)
+            delay = min(delay * 2, 0.25)
+        try:
+            yield
+        finally:
+            self.delete_if(key, token)
+
+
+def _to_bytes(value: Value) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode()
+
+
+class MemoryStore(SharedStore):
+    """In-process store used when the app runs as a single worker"""
+
+    is_shared = False
+
+    def __init__(self):
+        self.data: Dict[str, tuple] = {}
+        self.mutex = threading.Lock()
+
+    def _live(self, key: str):
+        entry = self.data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+            del self.data[key]
+            return None
+        return entry
+
+    def _expiry(self, ttl: Optional[float]) -> Optional[float]:
+        return time.monotonic() + ttl if ttl is not None else None
+
+    def get(self, key):
+        with self.mutex:
+            entry = self._live(key)
+            return _to_bytes(entry[0]) if entry is not None else None
+
+    def set(self, key, value, ttl=None):
+        with self.mutex:
+            self.data[key] = (value, self._expiry(ttl))
+
+    def add(self, key, value, ttl=None):
+        with self.mutex:
+            if self._live(key) is not None:
+                return False
+            self.data[key] = (value, self._expiry(ttl))
+            return True
+
+    def delete(self, key):
+        with self.mutex:
+            self.data.pop(key, None)
+
+    def delete_if(self, key, value):
+        with self.mutex:
+            entry = self._live(key)
+            if entry is None or entry[0] != value:
+                return False
+            del self.data[key]
+            return True
+
+    def incr(self, key, amount=1):
+        with self.mutex:
+            entry = self._live(key)
+            value = (int(entry[0]) if entry is not None else 0) + amount
+            self.data[key] = (value, entry[1] if entry is not None else None)
+            return value
+
+    def counters(self, prefix):
+        with self.mutex:
+            return {
+                key: int(entry[0]) for key, entry in list(self.data.items())
+                if key.startswith(prefix) and isinstance(entry[0], int) and self._live(key) is not None
+            }
+
+
+class SQLiteStore(SharedStore):
+    """Store backed by a local SQLite file; shared by workers on the same machine"""
+
+    # Expired rows are only filtered on read, so sweep them out every so often
+    PURGE_INTERVAL = 60
+
+    def __init__(self, path: str):
+        self.path = path
+        self.local = threading.local()
+        self.next_purge = 0.0
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv ("
+            "key TEXT PRIMARY KEY, value BLOB, expires_at REAL)"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread, and never reuse one inherited across fork()
+        conn = getattr(self.local, "conn", None)
+        if conn is None or self.local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+            self.local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def _expiry(ttl: Optional[float]) -> Optional[float]:
+        return time.time() + ttl if ttl is not None else None
+
+    def get(self, key):
+        row = self._conn().execute(
+            "SELECT value FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (key, time.time())
+        ).fetchone()
+        return _to_bytes(row[0]) if row is not None else None
+
+    def set(self, key, value, ttl=None):
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, self._expiry(ttl))
+        )
+        now = time.time()
+        if now >= self.next_purge:
+            self.next_purge = now + self.PURGE_INTERVAL
+            conn.execute("DELETE FROM kv WHERE expires_at <= ?", (now,))
+
+    def add(self, key, value, ttl=None):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM kv WHERE key = ? AND expires_at <= ?", (key, time.time()))
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, self._expiry(ttl))
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return cursor.rowcount == 1
+
+    def delete(self, key):
+        self._conn().execute("DELETE FROM kv WHERE key = ?", (key,))
+
+    def delete_if(self, key, value):
+        cursor = self._conn().execute("DELETE FROM kv WHERE key = ? AND value = ?", (key, value))
+        return cursor.rowcount == 1
+
+    def incr(self, key, amount=1):
+        row = self._conn().execute(
+            "INSERT INTO kv (key, value, expires_at) VALUES (?, ?, NULL) "
+            "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + excluded.value "
+            "RETURNING value",
+            (key, amount)
+        ).fetchone()
+        return int(row[0])
+
+    def counters(self, prefix):
+        rows = self._conn().execute(
+            "SELECT key, value FROM kv WHERE key >= ? AND key < ? AND typeof(value) = 'integer'",
+            (prefix, prefix + "\uffff")
+        ).fetchall()
+        return {key: int(value) for key, value in rows}
+
+
+class RedisStore(SharedStore):
+    """Store backed by any Redis-compatible server (Redis, Valkey, KeyDB, ...)"""
+
+    DELETE_IF_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+    def __init__(self, url: str):
+        # Only needed when SHARED_STORE_URL points at a Redis-compatible server
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("Install the 'redis' package to use a Redis shared store")
+        self.client = redis.Redis.from_url(url)
+        self.delete_if_script = self.client.register_script(self.DELETE_IF_SCRIPT)
+
+    @staticmethod
+    def _ms(ttl: Optional[float]) -> Optional[int]:
+        return max(1, int(ttl * 1000)) if ttl is not None else None
+
+    def get(self, key):
+        return self.client.get(key)
+
+    def set(self, key, value, ttl=None):
+        self.client.set(key, value, px=self._ms(ttl))
+
+    def add(self, key, value, ttl=None):
+        return bool(self.client.set(key, value, px=self._ms(ttl), nx=True))
+
+    def delete(self, key):
+        self.client.delete(key)
+
+    def delete_if(self, key, value):
+        return bool(self.delete_if_script(keys=[key], args=[value]))
+
+    def incr(self, key, amount=1):
+        return int(self.client.incrby(key, amount))
+
+    def counters(self, prefix):
+        keys = list(self.client.scan_iter(match=f"{prefix}*"))
+        values = self.client.mget(keys) if keys else []
+        result = {}
+        for key, value in zip(keys, values):
+            if value is not None and value.lstrip(b"-").isdigit():
+                result[key.decode()] = int(value)
+        return result
+
+
+def create_store(url: Optional[str]) -> SharedStore:
+    """Build a store from SHARED_STORE_URL: redis://..., sqlite:///path, or memory://"""
+    if not url or url.startswith("memory://"):
+        return MemoryStore()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisStore(url)
+    if url.startswith("sqlite:///"):
+        return SQLiteStore(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported SHARED_STORE_URL: {url}")
+
+
+_store: Optional[SharedStore] = None
+_store_lock = threading.Lock()
+
+
+def get_shared_store() -> SharedStore:
+    """Process-wide store; multi-worker deployments default to a local SQLite file"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                url = os.getenv("SHARED_STORE_URL")
+                if not url and int(os.getenv("WEB_CONCURRENCY", 1)) > 1:
+                    url = "sqlite:///./shared_store.db"
+                _store = create_store(url)
+    return _store
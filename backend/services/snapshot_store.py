@@ -0,0 +1,73 @@
+import hashlib
+import os
+import re
+import zlib
+from typing import Optional, Tuple
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+import models
+from services.parse_executor import extract_serialized
+
+try:
+    import zstandard
+except ImportError:  # Snapshots fall back to zlib; existing zstd rows need zstandard to read
+    zstandard = None
+
+load_dotenv()
+
+ZSTD_LEVEL = int(os.getenv("SNAPSHOT_ZSTD_LEVEL", 10))
+
+REVISION_PATTERN = re.compile(rb'"wgRevisionId":\s*(\d+)')
+
+
+def compress(html: bytes) -> Tuple[str, bytes]:
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(html)
+    return "zlib", zlib.compress(html, 9)
+
+
+def decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise ImportError("Install the 'zstandard' package to read zstd snapshots")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "zlib":
+        return zlib.decompress(data)
+    raise ValueError(f"Unknown snapshot codec: {codec}")
+
+
+def revision_id(html: bytes) -> Optional[int]:
+    """Wikipedia revision id from the page's embedded config, if present"""
+    match = REVISION_PATTERN.search(html)
+    return int(match.group(1)) if match else None
+
+
+def save_snapshot(db: Session, url: str, html: bytes) -> str:
+    """Stage a compressed, content-addressed copy of fetched HTML for the caller's commit"""
+    content_hash = hashlib.sha256(html).hexdigest()
+    if db.get(models.PageSnapshot, content_hash) is None:
+        codec, data = compress(html)
+        db.add(models.PageSnapshot(content_hash=content_hash, codec=codec, data=data, raw_size=len(html)))
+    already_indexed = db.query(models.SnapshotRevision.id)\
+        .filter(models.SnapshotRevision.url == url, models.SnapshotRevision.content_hash == content_hash)\
+        .first()
+    if not already_indexed:
+        db.add(models.SnapshotRevision(url=url, revision_id=revision_id(html), content_hash=content_hash))
+    # Flush so a repeat save in the same session sees these rows
+    db.flush()
+    return content_hash
+
+
+def latest_snapshot(db: Session, url: str) -> Optional[bytes]:
+    """Most recently fetched HTML for a URL, without touching the network"""
+    row = db.query(models.PageSnapshot.codec, models.PageSnapshot.data)\
+        .join(models.SnapshotRevision, models.SnapshotRevision.content_hash == models.PageSnapshot.content_hash)\
+        .filter(models.SnapshotRevision.url == url)\
+        .order_by(models.SnapshotRevision.id.desc())\
+        .first()
+    return decompress(row.codec, row.data) if row else None
+
+
+def extract_snapshot(url: str, codec: str, data: bytes) -> bytes:
+    """Decompress and extract a snapshot (picklable entry point for worker processes)"""
+    return extract_serialized(url, decompress(codec, data))
@@ -0,0 +1,24 @@
+import time
+from typing import Dict
+
+# Imported first by main.py, so this is (close to) when the app module started loading
+STARTED_AT = time.perf_counter()
+
+_last = STARTED_AT
+phases: Dict[str, float] = {}
+
+
+def mark(phase: str) -> None:
+    """Record how long the startup phase that just finished took"""
+    global _last
+    now = time.perf_counter()
+    phases[phase] = now - _last
+    _last = now
+
+
+def report() -> Dict[str, float]:
+    """Print and return the startup phases in milliseconds"""
+    profile = {phase: round(seconds * 1000, 1) for phase, seconds in phases.items()}
+    profile["total"] = round((_last - STARTED_AT) * 1000, 1)
+    print("Startup profile (ms): " + ", ".join(f"{k}={v}" for k, v in profile.items()))
+    return profile
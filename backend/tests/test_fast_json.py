@@ -0,0 +1,81 @@
+"""The orjson fast path must produce the same JSON as the Pydantic response models."""
+import json
+from datetime import datetime, timedelta
+from typing import List
+
+import pytest
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import models
+import schemas
+from services import fast_json
+
+list_adapter = TypeAdapter(List[schemas.ArticleListItem])
+
+
+def make_article(i: int, **overrides) -> models.Article:
+    fields = dict(
+        url=f"https://en.wikipedia.org/wiki/Article_{i}",
+        title=f"Article {i} – “quoted” ünïcode",
+        summary="Summary sentence. " * 5,
+        content="Content sentence. " * 20,
+        sections=[f"Section {s}" for s in range(3)],
+        key_entities={"people": ["Ada Lovelace"], "organizations": [], "locations": ["London"]},
+        quiz=[{
+            "question": f"Question about article {i}?",
+            "options": ["A", "B", "C", "D"],
+            "answer": "B",
+            "difficulty": "medium",
+            "explanation": "Because."
+        }],
+        related_topics=["Topic"],
+        created_at=datetime(2025, 1, 1, 12, 30, 15, 123456) + timedelta(minutes=i),
+    )
+    fields.update(overrides)
+    return models.Article(**fields)
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fast_json.db'}")
+    models.Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([make_article(i) for i in range(5)])
+    session.add(make_article(5, summary=None))
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def pydantic_list(db) -> list:
+    # What FastAPI does for response_model=List[ArticleListItem]
+    quizzes = db.query(models.Article).order_by(models.Article.created_at.desc()).all()
+    return list_adapter.dump_python(list_adapter.validate_python(quizzes, from_attributes=True), mode="json")
+
+
+def pydantic_detail(db, article_id: int) -> dict:
+    quiz = db.query(models.Article).filter(models.Article.id == article_id).first()
+    return schemas.ArticleResponse.model_validate(quiz).model_dump(mode="json")
+
+
+def test_list_matches_pydantic(db):
+    fast = fast_json.serialize_article_list(db)
+    list_adapter.validate_json(fast)
+    assert json.loads(fast) == pydantic_list(db)
+
+
+@pytest.mark.parametrize("article_id", range(1, 7))
+def test_detail_matches_pydantic(db, article_id):
+    fast = fast_json.serialize_article_row(fast_json.article_row(db, article_id))
+    schemas.ArticleResponse.model_validate_json(fast)
+    assert json.loads(fast) == pydantic_detail(db, article_id)
+
+
+def test_null_summary_is_served_as_null(db):
+    # Imported rows can lack a summary; both paths must serve it rather than fail validation
+    fast = json.loads(fast_json.serialize_article_row(fast_json.article_row(db, 6)))
+    assert fast["summary"] is None
+    assert pydantic_detail(db, 6)["summary"] is None
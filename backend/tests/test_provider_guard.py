@@ -0,0 +1,161 @@
+"""Provider guard behaviour against the local fake provider (benchmarks/fake_provider.py)."""
+import threading
+import time
+from collections import Counter
+from http.server import ThreadingHTTPServer
+
+import pytest
+from groq import BadRequestError, Groq, InternalServerError
+
+from benchmarks.fake_provider import make_handler
+from services.provider_guard import CircuitBreaker, ProviderGuard, ProviderUnavailableError
+
+
+@pytest.fixture
+def provider():
+    """Start a fake provider; tests fill `script` with (status, delay, retry_after) tuples"""
+    stats, script, arrivals = Counter(), [], []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(0, 0, 0, stats, script, arrivals))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = Groq(
+        api_key="fake-key",
+        base_url=f"http://127.0.0.1:{server.server_address[1]}",
+        max_retries=0,
+        timeout=5,
+    )
+
+    def call():
+        return client.chat.completions.create(
+            model="llama-3.3-70b-versatile",
+            messages=[{"role": "user", "content": "quiz"}],
+            max_tokens=100,
+        )
+
+    yield call, script, arrivals, stats
+    server.shutdown()
+
+
+def make_guard(**kwargs):
+    options = dict(
+        requests_per_minute=600,
+        tokens_per_minute=1_000_000,
+        max_retries=3,
+        max_wait=5,
+        base_backoff=0.01,
+        max_backoff=0.05,
+    )
+    options.update(kwargs)
+    return ProviderGuard(**options)
+
+
+def test_retry_after_pauses_and_spaces_queued_calls(provider):
+    call, script, arrivals, stats = provider
+    script.append((429, 0, "0.5"))
+    guard = make_guard()
+
+    threads = [threading.Thread(target=guard.call, args=(call, 100)) for _ in range(4)]
+    threads[0].start()
+    # Wait for the guard to act on the 429, not just for the server to send it
+    while guard.request_bucket.paused_until == 0.0:
+        time.sleep(0.01)
+    paused_at = arrivals[0]
+    # These queue up while the provider's pause is in force
+    for thread in threads[1:]:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert stats["429"] == 1 and stats["200"] == 4
+    # Nothing reaches the provider until Retry-After has passed...
+    assert min(arrivals[1:]) - paused_at >= 0.5
+    # ...and queued calls then go out at the refill rate (10/s), not in a burst
+    later = sorted(arrivals[1:])
+    gaps = [b - a for a, b in zip(later, later[1:])]
+    assert all(gap >= 0.08 for gap in gaps), gaps
+
+
+def test_breaker_opens_after_threshold_and_allows_one_trial(provider):
+    call, script, arrivals, stats = provider
+    script.extend([(503, 0, None), (503, 0, None), (200, 0.3, None)])
+    guard = make_guard(max_retries=0, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=0.2))
+
+    for _ in range(2):
+        with pytest.raises(InternalServerError):
+            guard.call(call, estimated_tokens=100)
+    assert guard.breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(ProviderUnavailableError):
+        guard.call(call, estimated_tokens=100)
+    assert len(arrivals) == 2
+
+    time.sleep(0.25)
+    results = []
+
+    def attempt():
+        try:
+            guard.call(call, estimated_tokens=100)
+            results.append("ok")
+        except ProviderUnavailableError:
+            results.append("rejected")
+
+    trial = threading.Thread(target=attempt)
+    trial.start()
+    time.sleep(0.1)  # the trial is now waiting on the slow provider
+    attempt()
+    trial.join()
+
+    assert sorted(results) == ["ok", "rejected"]
+    assert len(arrivals) == 3
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_full_queue_rejects_with_retry_after(provider):
+    call, script, arrivals, stats = provider
+    script.append((200, 0.3, None))
+    guard = make_guard(max_queue=1, max_wait=7)
+
+    first = threading.Thread(target=guard.call, args=(call, 100))
+    first.start()
+    time.sleep(0.1)
+    with pytest.raises(ProviderUnavailableError) as error:
+        guard.call(call, estimated_tokens=100)
+    first.join()
+
+    assert error.value.retry_after == 7
+    assert len(arrivals) == 1
+
+
+def test_wait_beyond_max_wait_is_rejected_without_calling(provider):
+    call, script, arrivals, stats = provider
+    # One request per minute: the second call would have to wait ~60 s
+    guard = make_guard(requests_per_minute=1, max_wait=2)
+
+    guard.call(call, estimated_tokens=100)
+    with pytest.raises(ProviderUnavailableError) as error:
+        guard.call(call, estimated_tokens=100)
+
+    assert 59 <= error.value.retry_after <= 60
+    assert len(arrivals) == 1
+    # The rejected call's reservation was refunded
+    assert guard.request_bucket.tokens > -0.5
+
+
+def test_client_errors_are_not_retried(provider):
+    call, script, arrivals, stats = provider
+    script.append((400, 0, None))
+    guard = make_guard(max_retries=3)
+
+    with pytest.raises(BadRequestError):
+        guard.call(call, estimated_tokens=100)
+
+    assert len(arrivals) == 1
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_unused_tokens_are_refunded(provider):
+    call, script, arrivals, stats = provider
+    guard = make_guard(tokens_per_minute=6000)
+
+    guard.call(call, estimated_tokens=2500)
+
+    # The fake provider reports 1500 tokens used, so 1000 of the 2500 come back
+    assert guard.token_bucket.tokens == pytest.approx(6000 - 1500, abs=5)
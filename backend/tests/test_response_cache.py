@@ -0,0 +1,59 @@
+"""Invalidation across workers that share a SQLite store."""
+import pytest
+
+from services.response_cache import ResponseCache
+from services.shared_store import SharedStore, SQLiteStore
+
+
+@pytest.fixture
+def workers(tmp_path):
+    path = str(tmp_path / "shared.db")
+    # Separate store objects stand in for separate worker processes
+    return ResponseCache(store=SQLiteStore(path)), ResponseCache(store=SQLiteStore(path))
+
+
+def test_put_is_served_by_other_workers(workers):
+    a, b = workers
+    assert a.get(1) is None
+    a.put(1, '"e1"', b"{}")
+    assert b.get(1) == ('"e1"', b"{}")
+
+
+def test_invalidate_drops_only_that_quiz(workers):
+    a, b = workers
+    for quiz_id in (1, 2):
+        a.get(quiz_id)
+        a.put(quiz_id, f'"e{quiz_id}"', b"{}")
+        b.get(quiz_id)
+
+    b.invalidate(1)
+
+    assert a.get(1) is None
+    assert a.get(2) == ('"e2"', b"{}")
+    # Still the same shared generation, so quiz 2 was not evicted elsewhere either
+    assert ResponseCache(store=a.store).get(2) == ('"e2"', b"{}")
+
+
+def test_stale_put_after_invalidate_is_dropped(workers):
+    a, b = workers
+    # a read the quiz before b deleted it, and stores it afterwards
+    assert a.get(1) is None
+    b.invalidate(1)
+    a.put(1, '"stale"', b"{}")
+    assert a.get(1) is None
+    assert b.get(1) is None
+
+
+def test_invalidate_all(workers):
+    a, b = workers
+    a.get(1)
+    a.put(1, '"e1"', b"{}")
+    b.get(1)
+    a.invalidate_all()
+    assert b.get(1) is None
+    assert a.get(1) is None
+
+
+def test_shared_store_is_abstract():
+    with pytest.raises(TypeError):
+        SharedStore()
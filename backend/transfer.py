@@ -0,0 +1,67 @@
+"""Bulk export and import of articles, quizzes and quiz attempts as NDJSON.
+
+    python transfer.py export backup.ndjson.gz          # gzip when the name ends in .gz
+    python transfer.py export - --tables quiz,quiz_attempt > attempts.ndjson
+    python transfer.py import backup.ndjson.gz
+
+Both directions stream, so memory use stays flat regardless of table size.
+"""
+import argparse
+import sys
+from database import SessionLocal
+from services.bulk_transfer import BulkImporter, LineDecoder, export_stream, parse_tables
+
+READ_SIZE = 1024 * 1024
+
+
+def export_command(args):
+    compress = args.gzip or args.path.endswith(".gz")
+    output = sys.stdout.buffer if args.path == "-" else open(args.path, "wb")
+    try:
+        for chunk in export_stream(parse_tables(args.tables), compress=compress, chunk_size=args.batch_size):
+            output.write(chunk)
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+
+
+def import_command(args):
+    source = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+    db = SessionLocal()
+    try:
+        decoder = LineDecoder()
+        importer = BulkImporter(db, batch_size=args.batch_size)
+        while True:
+            chunk = source.read(READ_SIZE)
+            if not chunk:
+                break
+            importer.feed(decoder.feed(chunk))
+        importer.feed(decoder.finish())
+        counts = importer.finish()
+        print("Imported " + ", ".join(f"{count} {name} records" for name, count in counts.items()))
+        if importer.orphaned_attempts:
+            print(f"Skipped {importer.orphaned_attempts} attempts whose quiz was not in the import")
+    finally:
+        db.close()
+        if source is not sys.stdin.buffer:
+            source.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk export and import quiz data as NDJSON")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="write NDJSON to a file (or - for stdout)")
+    export_parser.add_argument("path")
+    export_parser.add_argument("--tables", help="comma-separated: article,quiz,quiz_attempt")
+    export_parser.add_argument("--gzip", action="store_true")
+    export_parser.add_argument("--batch-size", type=int, default=1000)
+    export_parser.set_defaults(func=export_command)
+
+    import_parser = commands.add_parser("import", help="read NDJSON (plain or gzip) from a file or -")
+    import_parser.add_argument("path")
+    import_parser.add_argument("--batch-size", type=int, default=1000)
+    import_parser.set_defaults(func=import_command)
+
+    args = parser.parse_args()
+    args.func(args)